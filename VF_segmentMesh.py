@@ -11,14 +11,54 @@ bl_info = {
 	"category": "3D View"}
 
 import bpy
+import blf
 import bmesh
-from mathutils import Vector
+import gpu
+import argparse
+import concurrent.futures
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
 from mathutils import Matrix
-from bpy.app.handlers import persistent
+from bpy_extras.view3d_utils import location_3d_to_region_2d
+from gpu_extras.batch import batch_for_shader
+
+# Import a module on first use instead of when the add-on is enabled, so Blender startup doesn't pay for the NumPy engines and worker processes until segmentation or the preview needs them
+def lazy_import(name):
+	if name in sys.modules:
+		return sys.modules[name]
+	spec = importlib.util.find_spec(name)
+	loader = importlib.util.LazyLoader(spec.loader)
+	spec.loader = loader
+	module = importlib.util.module_from_spec(spec)
+	sys.modules[name] = module
+	loader.exec_module(module)
+	return module
+
+np = lazy_import("numpy")
+multiprocessing = lazy_import("multiprocessing")
+
+try:
+	import resource
+except ImportError:
+	resource = None
 
 ###########################################################################
 # Main class
 
+# Maximum time spent creating tiles for each timer event while running modally
+MODAL_BATCH_SECONDS = 0.1
+
+# Events passed through to the interface while tiles are being created (viewport navigation only, so the scene can't be edited mid-run)
+MODAL_PASS_THROUGH_EVENTS = {'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 'TRACKPADPAN', 'TRACKPADZOOM', 'NDOF_MOTION'}
+
 class VF_SegmentMesh(bpy.types.Operator):
 	bl_idname = "object.vf_segment_mesh"
 	bl_label = "Segment Mesh"
@@ -31,174 +71,2391 @@ class VF_SegmentMesh(bpy.types.Operator):
 	def draw(self, context):
 		try:
 			layout = self.layout
-			layout.label(text="Blender will be unresponsive while processing, proceed?")
+			layout.label(text="Tiles will be created in batches, press Esc to cancel. Proceed?")
 		except Exception as exc:
 			print(str(exc) + ' | Error in VF Segment Mesh: Begin segmentation confirmation')
 	
 	def execute(self, context):
 		# Set up local variables
-		sizeX = context.scene.vf_segment_mesh_settings.tile_size[0]
-		sizeY = context.scene.vf_segment_mesh_settings.tile_size[1]
-		countX = context.scene.vf_segment_mesh_settings.tile_count[0]
-		countY = context.scene.vf_segment_mesh_settings.tile_count[1]
-		startX = sizeX * float(countX) * -0.5
-		startY = sizeY * float(countY) * -0.5
-		segment = context.scene.vf_segment_mesh_settings.tile_segment
-		origin = context.scene.vf_segment_mesh_settings.tile_origin
-		bounds = True if context.scene.vf_segment_mesh_settings.tile_bounds == "OUT" else False
+		settings = context.scene.vf_segment_mesh_settings
+		sizeX = settings.tile_size[0]
+		sizeY = settings.tile_size[1]
+		countX = settings.tile_count[0]
+		countY = settings.tile_count[1]
+		startX = settings.grid_center[0] - sizeX * float(countX) * 0.5
+		startY = settings.grid_center[1] - sizeY * float(countY) * 0.5
+		segment = settings.tile_segment
+		origin = settings.tile_origin
+		bounds = True if settings.tile_bounds == "OUT" else False
 		attribute_name = "island_position"
 		
-		# Get active object by name instead of by active reference (so the source object doesn't change during processing)
-		object_name = str(context.active_object.name)
-		mesh_object = bpy.data.objects[object_name]
+		# Floor division into tiles requires a positive tile size (fitted grids are always positive)
+		if settings.grid_fit == "MANUAL" and (sizeX <= 0.0 or sizeY <= 0.0):
+			self.report({'ERROR'}, "Tile size must be greater than zero")
+			return {'CANCELLED'}
+		
+		# Wall time of each processing phase, plus memory use and per-tile details when profiling
+		phases = {}
+		profile = new_profile() if settings.profile else None
+		phase_start = time.perf_counter()
 		
-		# Deselect all
-		bpy.ops.object.mode_set(mode='EDIT')
-		bpy.ops.mesh.select_all(action='DESELECT')
-		bpy.ops.object.mode_set(mode='OBJECT')
+		# Get source objects by name instead of by active reference (so they don't change during processing)
+		object_names = [obj.name for obj in get_source_objects(context, settings)]
+		if not object_names:
+			self.report({'ERROR'}, "No mesh objects with polygons to segment")
+			return {'CANCELLED'}
 		
-		# Apply all transforms (otherwise world-space calculations are going to be all off)
-		bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
+		# Grouping polygons by key needs the attribute or vertex groups on every source
+		missing = [object_name for object_name in object_names if not has_tile_key(bpy.data.objects[object_name], settings)]
+		if missing:
+			self.report({'ERROR'}, ("No vertex groups" if settings.tile_assign == "VERTEX_GROUP" else "No face, point, or corner attribute named " + settings.tile_key) + " in " + ", ".join(missing))
+			return {'CANCELLED'}
+		mesh_object = bpy.data.objects[object_names[0]]
+		run_name = settings.source_collection.name if settings.source_mode == "COLLECTION" else mesh_object.name
+		
+		# Keeping the source leaves its mesh data and transform untouched, reading world space positions into the bulk arrays instead
+		# Several sources are always kept, so a shared grid run doesn't repeat the deselect and transform setup for every object
+		# Streaming to files never changes the source either, so its transform isn't applied and island attributes aren't stored in it
+		multiple = settings.source_mode != "ACTIVE"
+		keep_source = settings.keep_source or multiple or settings.tile_output == "STREAM"
+		original_matrix = mesh_object.matrix_world.copy()
+		if not keep_source:
+			# Deselect all
+			bpy.ops.object.mode_set(mode='EDIT')
+			bpy.ops.mesh.select_all(action='DESELECT')
+			bpy.ops.object.mode_set(mode='OBJECT')
+			
+			# Apply all transforms (otherwise world-space calculations are going to be all off)
+			bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
+		phase_start = add_phase_time(phases, "prepare", phase_start, profile)
 		
 		# May need to apply all modifiers if significant changes are made to the geometry via modifiers
 #		bpy.ops.object.apply_all_modifiers()
 		
+		# Read every source once, concatenating element positions and weights so tiles are assigned on one shared grid
+		sources = []
+		for object_name in object_names:
+			source_object = bpy.data.objects[object_name]
+			mesh_arrays, positions, island_attributes, phase_start = self.read_source(context, settings, source_object, keep_source, phases, phase_start, profile)
+			sources.append((source_object, mesh_arrays, positions))
+		element_positions = np.concatenate([positions for source_object, mesh_arrays, positions in sources])
+		face_weights = np.concatenate([get_face_weights(mesh_arrays, settings.tile_budget_unit) for source_object, mesh_arrays, positions in sources])
+		face_offsets = np.cumsum([0] + [len(mesh_arrays["loop_total"]) for source_object, mesh_arrays, positions in sources])
+		
+		# Merged output combines every source into one set of arrays, grouped output keeps separate tiles for each source
+		if multiple and settings.source_merge == "MERGED":
+			outputs = [(mesh_object, merge_mesh_arrays([mesh_arrays for source_object, mesh_arrays, positions in sources]), run_name)]
+			output_offsets = face_offsets[[0, -1]]
+			phase_start = add_phase_time(phases, "read", phase_start, profile)
+		else:
+			outputs = [(source_object, mesh_arrays, source_object.name) for source_object, mesh_arrays, positions in sources]
+			output_offsets = face_offsets
+		
+		# Fit the grid to the element positions, saving the result so it's shown in the panel and can be reused manually
+		if settings.grid_fit == "AUTO" and settings.tile_assign == "GRID":
+			(startX, startY), (sizeX, sizeY), (countX, countY), heaviest = fit_grid(element_positions, face_weights, settings.tile_budget)
+			settings.tile_size = (sizeX, sizeY)
+			settings.tile_count = (countX, countY)
+			settings.grid_center = (startX + sizeX * countX * 0.5, startY + sizeY * countY * 0.5)
+			self.report({'INFO'}, "Fitted " + str(countX) + " x " + str(countY) + " tiles of " + "{:.3f}".format(sizeX) + " units")
+			if heaviest > settings.tile_budget:
+				self.report({'WARNING'}, "Geometry is too dense to fit the budget within " + str(GRID_FIT_MAX_COUNT) + " x " + str(GRID_FIT_MAX_COUNT) + " tiles, the heaviest tile is " + str(int(heaviest)) + " " + settings.tile_budget_unit.lower())
+		
+		# Cut polygons along the tile boundaries, so every piece lies within a single tile and is assigned by its centre
+		if segment == "CLIP":
+			outputs = [(source_object, clip_mesh_arrays(mesh_arrays, (startX, startY), (sizeX, sizeY), (countX, countY), bounds), output_name) for source_object, mesh_arrays, output_name in outputs]
+			element_positions = np.concatenate([get_polygon_centers(mesh_arrays) for source_object, mesh_arrays, output_name in outputs])
+			face_weights = np.concatenate([get_face_weights(mesh_arrays, settings.tile_budget_unit) for source_object, mesh_arrays, output_name in outputs])
+			output_offsets = np.cumsum([0] + [len(mesh_arrays["loop_total"]) for source_object, mesh_arrays, output_name in outputs])
+			phase_start = add_phase_time(phases, "clip", phase_start, profile)
+		lod_tiles = []
+		
+		# Group polygons into one tile per attribute value or vertex group, with keys matched by label across sources
+		if settings.tile_assign != "GRID":
+			face_keys, key_labels = merge_face_keys([get_face_keys(mesh_arrays, settings.tile_assign, settings.tile_key) for source_object, mesh_arrays, output_name in outputs])
+			tile_indices, tile_layout = get_key_tiles(element_positions, face_keys, key_labels)
+		else:
+			tile_indices = get_tile_indices(element_positions, (startX, startY), (sizeX, sizeY), (countX, countY), bounds)
+			tile_layout = get_grid_layout((startX, startY), (sizeX, sizeY), (countX, countY))
+			
+			# Adaptive quadtree subdivision of the grid tiles
+			if settings.tile_layout == "QUADTREE":
+				tile_indices, tile_layout, lod_tiles = get_quadtree_tiles(element_positions, tile_indices, face_weights, (startX, startY), (sizeX, sizeY), (countX, countY), settings.tile_budget, settings.quadtree_depth, settings.tile_lod and settings.tile_output == "OBJECTS")
+		
+		# Split tiles over the budget and merge sparse neighbours
+		if settings.tile_balance:
+			tile_indices, tile_layout = balance_tiles(element_positions, tile_indices, face_weights, tile_layout, settings.tile_budget)
+		phase_start = add_phase_time(phases, "assign", phase_start, profile)
+		
+		# Stream tiles straight to disk with bounded memory instead of creating scene objects (the source mesh is left in place)
+		if settings.tile_output == "STREAM":
+			output_dir = bpy.path.abspath(settings.output_path)
+			
+			# Parallel writing forks worker processes, which is only done when running headless
+			workers = get_worker_count(settings.worker_count) if bpy.app.background else 1
+			
+			# Each output gets its own tile files and index, using its slice of the shared tile assignment
+			files = {}
+			for index, (source_object, mesh_arrays, output_name) in enumerate(outputs):
+				stats = self.write_tile_files(settings, mesh_arrays, tile_indices[output_offsets[index]:output_offsets[index + 1]], tile_layout, bpy.path.clean_name(output_name), origin, output_dir, workers)
+				files.update(stats["files"])
+			add_phase_time(phases, "write", phase_start, profile)
+			store_last_run(phases, len(files))
+			if profile is not None:
+				profile["tiles"] = [{"name": name, "path": entry["path"]} for name, entry in files.items()]
+				self.report({'INFO'}, "Profile report written to " + write_profile_report(profile, phases, get_run_info(settings, run_name, [mesh_arrays for source_object, mesh_arrays, output_name in outputs])))
+			return {'FINISHED'}
+		
+		# Store everything the tile batches need, so tiles can be created across multiple timer events
+		self._run = {
+			"mesh_object": mesh_object,
+			"source_objects": [source_object for source_object, mesh_arrays, positions in sources],
+			"run_name": run_name,
+			"outputs": outputs,
+			"tile_indices": tile_indices,
+			"tiles": split_source_tiles(list(get_tile_faces(tile_indices)) + lod_tiles, output_offsets),
+			"next_tile": 0,
+			"layout": tile_layout,
+			"level_collections": {} if settings.tile_layout == "QUADTREE" else None,
+			"lod_ratio": settings.lod_ratio,
+			"origin": origin,
+			"original_matrix": original_matrix,
+			"keep_source": keep_source,
+			"island_attributes": island_attributes,
+			"clipped": segment == "CLIP",
+			# Origin, bounds, and counts of every tile for the tile index
+			"tile_index": {} if settings.tile_index else None,
+			"weld_distance": settings.weld_distance if settings.tile_weld else None,
+			"saved_bytes": 0,
+			"index_dir": bpy.path.abspath(settings.output_path),
+			# Track names of each created object
+			"separated_collection": [],
+			"start_time": time.perf_counter(),
+			"phases": phases,
+			"profile": profile,
+			"run_info": get_run_info(settings, run_name, [mesh_arrays for source_object, mesh_arrays, output_name in outputs]) if profile is not None else None,
+			}
+		
+		# Without a window (headless or scripted runs) every tile is created immediately
+		if bpy.app.background or context.window is None:
+			while self._run["next_tile"] < len(self._run["tiles"]):
+				self.process_tile(context)
+			return self.finish(context)
+		
+		# Otherwise create tiles in timed batches so the interface stays responsive
+		context.window_manager.progress_begin(0, len(self._run["tiles"]))
+		self._timer = context.window_manager.event_timer_add(0.01, window=context.window)
+		context.window_manager.modal_handler_add(self)
+		return {'RUNNING_MODAL'}
+	
+	# Read the bulk arrays and element positions of one source object, reusing island data cached from an earlier run on the same geometry
+	# Also returns whether island attributes were written into the source, and the start time of the next phase
+	def read_source(self, context, settings, source_object, keep_source, phases, phase_start, profile):
+		segment = settings.tile_segment
+		island_engine = settings.island_engine
+		
+		# Island data cached from an earlier run on the same geometry skips island detection entirely
+		mesh_arrays = None
+		island_cached = False
+		if segment not in POLYGON_SEGMENTS and settings.island_cache != "NONE":
+			mesh_arrays = read_mesh_arrays(source_object, keep_source)
+			island_cached = load_cached_islands(mesh_arrays, settings.island_cache)
+			phase_start = add_phase_time(phases, "read", phase_start, profile)
+		
 		# Calculate island positions using Geometry Nodes (more than hundreds of times faster than manual BMesh calculation)
-		if segment != "POLY":
-			mod = mesh_object.modifiers.new(name="VF-StoreIslandAttributes-TEMP", type='NODES')
-			mod.node_group = store_island_attributes_node_group()
+		# The NumPy island engine computes the same positions in memory later on, without writing attributes into the source mesh
+		island_attributes = segment not in POLYGON_SEGMENTS and island_engine == "NODES" and not island_cached and not keep_source
+		if island_attributes:
+			mod = source_object.modifiers.new(name="VF-StoreIslandAttributes-TEMP", type='NODES')
+			mod.node_group = get_island_node_group()
 			bpy.ops.object.modifier_apply(modifier="VF-StoreIslandAttributes-TEMP")
-			bpy.data.node_groups.remove(bpy.data.node_groups["VF-StoreIslandAttributes-TEMP"])
-		
-		# Save current 3D cursor location and pivot point
-		original_cursor = context.scene.cursor.matrix
-		original_pivot = context.tool_settings.transform_pivot_point
-		
-		# Track names of each created object
-		separated_collection = []
-		
-		# Loop through each grid space
-		for x in range(countX):
-			# Define min/max for X
-			min_x = startX + (x * sizeX)
-			max_x = min_x + sizeX
-			loc_x = (max_x + min_x) / 2
-			if bounds:
-				if x == 0:
-					min_x = float('-inf')
-				elif x == countX-1:
-					max_x = float('inf')
+			mesh_arrays = None
+			phase_start = add_phase_time(phases, "islands", phase_start, profile)
+		
+		# Gather vertex, loop, polygon and attribute arrays once, so every tile can be built directly without operators or mode switches
+		if mesh_arrays is None:
+			mesh_arrays = read_mesh_arrays(source_object, keep_source)
+			phase_start = add_phase_time(phases, "read", phase_start, profile)
+		
+		# Without writing into the source, Geometry Nodes islands are evaluated on a temporary object sharing its mesh data
+		if segment not in POLYGON_SEGMENTS and island_engine == "NODES" and not island_cached and keep_source:
+			mesh_arrays["islands"] = get_node_island_arrays(context, source_object.data, source_object.matrix_world)
+			phase_start = add_phase_time(phases, "islands", phase_start, profile)
+		
+		# Element positions used to assign each polygon to a tile
+		element_positions = get_polygon_positions(mesh_arrays, segment, island_engine)
+		if segment not in POLYGON_SEGMENTS and not island_cached:
+			store_cached_islands(mesh_arrays, get_island_arrays(mesh_arrays, island_engine), settings.island_cache, settings.island_cache_limit)
+			if island_engine == "NUMPY":
+				phase_start = add_phase_time(phases, "islands", phase_start, profile)
+		return mesh_arrays, element_positions, island_attributes, phase_start
+	
+	# Stream the tiles of one output to files (only the changed tiles when incremental) along with its tile index, returning the write statistics
+	def write_tile_files(self, settings, mesh_arrays, tile_indices, tile_layout, base_name, origin, output_dir, workers):
+		weld_distance = settings.weld_distance if settings.tile_weld else None
+		if workers > 1:
+			write_tiles = lambda indices: write_tiles_parallel(mesh_arrays, indices, tile_layout, base_name, origin, output_dir, workers, settings.output_format, weld_distance)
+		else:
+			write_tiles = lambda indices: stream_tiles(mesh_arrays, indices, tile_layout, base_name, origin, output_dir, settings.memory_budget, settings.output_format, weld_distance)
+		
+		if settings.incremental:
+			stats = write_tiles_incremental(mesh_arrays, tile_indices, tile_layout, base_name, output_dir, get_manifest_settings(settings), write_tiles)
+			self.report({'INFO'}, base_name + ": " + str(stats["changed_faces"]) + " changed faces, skipped " + str(stats["skipped"]) + " unchanged tiles and removed " + str(stats["removed"]) + " empty tiles")
+		else:
+			stats = write_tiles(tile_indices)
+		if workers > 1:
+			self.report({'INFO'}, "Wrote " + str(stats["tiles"]) + " " + base_name + " tiles to " + output_dir + " using " + str(stats["workers"]) + " worker processes (peak process memory " + format_bytes(stats["peak_process_bytes"]) + ")")
+		else:
+			self.report({'INFO'}, "Streamed " + str(stats["tiles"]) + " " + base_name + " tiles to " + output_dir + " (peak tile buffers " + format_bytes(stats["peak_buffer_bytes"]) + ", peak process memory " + format_bytes(stats["peak_process_bytes"]) + ")")
+		if weld_distance is not None:
+			self.report({'INFO'}, "Welding and compacting saved " + format_bytes(sum(entry["saved_bytes"] for entry in stats.get("written", stats["files"]).values())) + " of vertex and index data in " + base_name + " tiles")
+		write_tile_index(output_dir, base_name, stats["files"], settings.output_format)
+		return stats
+	
+	def modal(self, context, event):
+		if event.type == 'ESC':
+			# Cancelling releases the run data, so the tile count is read first
+			created = self._run["next_tile"]
+			self.cancel(context)
+			self.report({'WARNING'}, "Segmentation cancelled, " + str(created) + " partially created tiles were removed")
+			return {'CANCELLED'}
+		
+		if event.type in MODAL_PASS_THROUGH_EVENTS:
+			return {'PASS_THROUGH'}
+		if event.type != 'TIMER':
+			return {'RUNNING_MODAL'}
+		
+		# Create tiles until the batch time runs out (always at least one per event)
+		batch_start = time.perf_counter()
+		while self._run["next_tile"] < len(self._run["tiles"]):
+			self.process_tile(context)
+			if time.perf_counter() - batch_start > MODAL_BATCH_SECONDS:
+				break
+		
+		done = self._run["next_tile"]
+		remaining = len(self._run["tiles"]) - done
+		if remaining == 0:
+			self.end_modal(context)
+			return self.finish(context)
+		
+		# Report progress with an estimate of the remaining time
+		elapsed = time.perf_counter() - self._run["start_time"]
+		context.window_manager.progress_update(done)
+		context.workspace.status_text_set("Segment Mesh: " + str(done) + " tiles done, " + str(remaining) + " remaining, about " + str(int(round(elapsed / done * remaining))) + "s left (Esc to cancel)")
+		return {'RUNNING_MODAL'}
+	
+	def process_tile(self, context):
+		tile_layout = self._run["layout"]
+		origin = self._run["origin"]
+		tile, tile_faces, source = self._run["tiles"][self._run["next_tile"]]
+		source_object, mesh_arrays, source_name = self._run["outputs"][source]
+		self._run["next_tile"] += 1
+		
+		# Create tile name
+		tile_name = get_tile_name(source_name, tile_layout, tile)
+		
+		# Slice the tile from the source arrays and place its origin numerically (the same positions as the origin_set operators, without changing the cursor or pivot point)
+		profile = self._run["profile"]
+		tile_start = phase_start = time.perf_counter()
+		tile_memory = profile["memory"] if profile is not None else None
+		tile_geometry = get_tile_geometry(mesh_arrays, tile_faces)
+		
+		# Weld coincident vertices and reorder the tile for vertex cache locality
+		if self._run["weld_distance"] is not None:
+			vertex_count, corner_count = len(tile_geometry["vertices"]), len(tile_geometry["loops"])
+			tile_geometry = optimize_tile_geometry(mesh_arrays, tile_geometry, self._run["weld_distance"])
+			self._run["saved_bytes"] += get_weld_savings(vertex_count, corner_count, len(tile_geometry["vertices"]), len(tile_geometry["loops"]))
+			phase_start = add_phase_time(self._run["phases"], "weld", phase_start, profile)
 			
-			for y in range(countY):
-				# Define min/max for Y
-				min_y = startY + (y * sizeY)
-				max_y = min_y + sizeY
-				loc_y = (max_y + min_y) / 2
-				if bounds:
-					if y == 0:
-						min_y = float('-inf')
-					elif y == countY-1:
-						max_y = float('inf')
-				
-				# Prevent out-of-range errors (seems like the attribute indices aren't updated after splitting geometry)
-				mesh_object.data.update()
-				
-				# Re-get the mesh data to ensure everything is up-to-date
-				mesh_data = mesh_object.data
-				
-				# Get attribute data if needed
-				if segment == "AVERAGE":
-					island_info = "island_mean"
-				elif segment == "WEIGHTED":
-					island_info = "island_weighted"
-				else:
-					island_info = False
-				
-				# Create tile name
-				tile_name = mesh_object.name + "-Tile-" + str(x) + "-" + str(y)
-				
-				# Count how many polygons have been selected
-				count = 0
-				
-				# Select polygons within the specified XYZ area
-				for polygon in mesh_data.polygons:
-					if island_info:
-						# Get precalculated island position
-						element_position = mesh_data.attributes[island_info].data[polygon.index].vector
-					else:
-						# Find average vertex location of individual polygon
-						element_position = Vector((0, 0, 0))
-						for vertice_index in polygon.vertices:
-							element_position += mesh_data.vertices[vertice_index].co
-						element_position /= len(polygon.vertices)
-					
-					# Check element position against min/max
-					if min_x <= element_position.x <= max_x and min_y <= element_position.y <= max_y:
-						polygon.select = True
-						count += 1
-				
-				# Only create a new segment if there are 1 or more polygons selected
-				if count > 0:
-					# Separate selected polygons into a new object
-					context.view_layer.objects.active = mesh_object
-					mesh_object.select_set(True)
-					bpy.ops.object.mode_set(mode='EDIT')
-					bpy.ops.mesh.separate(type='SELECTED')
-					bpy.ops.object.mode_set(mode='OBJECT')
-					
-					# Rename the separated object and mesh
-					separated_object = context.selected_objects[1]
-					separated_object.name = tile_name
-					separated_mesh = separated_object.data
-					separated_mesh.name = tile_name
-					separated_object.select_set(False)
-					separated_collection.append(tile_name)
-					
-					# Apply transforms, set the origin, and set the position of the separated object
-					with context.temp_override(
-							active_object=separated_object,
-							editable_objects=[separated_object],
-							object=separated_object,
-							selectable_objects=[separated_object],
-							selected_editable_objects=[separated_object],
-							selected_objects=[separated_object]):
-						
-						if origin == "TILE":
-							context.scene.cursor.matrix = Matrix(((1.0, 0.0, 0.0, loc_x),(0.0, 1.0, 0.0, loc_y),(-0.0, 0.0, 1.0, 0.0),(0.0, 0.0, 0.0, 1.0)))
-							bpy.ops.object.origin_set(type='ORIGIN_CURSOR')
-						elif origin == "BOX":
-							context.tool_settings.transform_pivot_point = "BOUNDING_BOX_CENTER"
-							bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY')
-						elif origin == "MEDIAN":
-							context.tool_settings.transform_pivot_point = "MEDIAN_POINT"
-							bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY')
-						elif origin == "MASS":
-							bpy.ops.object.origin_set(type='ORIGIN_CENTER_OF_MASS')
-						elif origin == "VOLUME":
-							bpy.ops.object.origin_set(type='ORIGIN_CENTER_OF_VOLUME')
+			# Tiles where every polygon collapses under the weld distance get no object or index entry
+			if len(tile_geometry["faces"]) == 0:
+				return
+		origin_start = phase_start
+		tile_origin = get_geometry_origin(origin, mesh_arrays["co"][tile_geometry["vertices"]], tile_geometry["loop_vertex"], tile_geometry["loop_start"], tile_geometry["loop_total"], tile_layout[tile]["center"])
+		phase_start = add_phase_time(self._run["phases"], "origin", phase_start, profile)
+		origin_seconds = phase_start - origin_start
+		
+		# Build the tile object with its vertices offset from the origin
+		separated_object = build_tile_object(source_object, tile_name, mesh_arrays, tile_geometry, tile_origin, self.get_level_collection(tile_layout[tile]["level"]))
+		self._run["separated_collection"].append(separated_object.name)
+		
+		# Coarse LOD tiles are decimated non-destructively, so the ratio can still be adjusted or applied on export
+		if tile_layout[tile].get("lod"):
+			decimate = separated_object.modifiers.new(name="VF-LOD", type='DECIMATE')
+			decimate.ratio = self._run["lod_ratio"]
+		tile_end = add_phase_time(self._run["phases"], "build", phase_start, profile)
+		
+		# Index entry calculated from the same arrays (byte counts are estimated, since object tiles have no file)
+		if self._run["tile_index"] is not None:
+			tile_co = mesh_arrays["co"][tile_geometry["vertices"]]
+			self._run["tile_index"][separated_object.name] = {
+				"origin": np.asarray(tile_origin, dtype=np.float64).tolist(),
+				"bounds": [tile_co.min(axis=0).tolist(), tile_co.max(axis=0).tolist()],
+				"faces": len(tile_geometry["faces"]),
+				"vertices": len(tile_geometry["vertices"]),
+				"bytes": len(tile_geometry["loops"]) * ESTIMATED_CORNER_BYTES,
+				}
+		
+		if profile is not None:
+			profile["tiles"].append({
+				"name": separated_object.name,
+				"faces": len(tile_geometry["faces"]),
+				"vertices": len(tile_geometry["vertices"]),
+				"build": tile_end - tile_start - origin_seconds,
+				"origin": origin_seconds,
+				"memory_delta": profile["memory"] - tile_memory if tile_memory is not None and profile["memory"] is not None else None,
+				})
+	
+	def get_level_collection(self, level):
+		# Quadtree tiles are grouped into one collection per level, nested in the (first) source object's collection
+		if self._run["level_collections"] is None:
+			return None
+		if level not in self._run["level_collections"]:
+			mesh_object = self._run["mesh_object"]
+			collection = bpy.data.collections.new(self._run["run_name"] + "-Tiles-L" + str(level))
+			parent = mesh_object.users_collection[0] if mesh_object.users_collection else bpy.context.scene.collection
+			parent.children.link(collection)
+			self._run["level_collections"][level] = collection.name
+		return bpy.data.collections[self._run["level_collections"][level]]
+	
+	def finish(self, context):
+		mesh_object = self._run["mesh_object"]
+		separated_collection = self._run["separated_collection"]
+		phase_start = time.perf_counter()
+		
+		# Remove all tiled polygons from the source in a single edit (matching the previous separation behaviour)
+		# Clipped polygons no longer match the source polygons, so the source is rebuilt from the pieces left outside the grid instead
+		if not self._run["keep_source"] and self._run["clipped"]:
+			replace_mesh_faces(mesh_object, self._run["outputs"][0][1], np.flatnonzero(self._run["tile_indices"] < 0))
+		elif not self._run["keep_source"]:
+			remove_mesh_faces(mesh_object.data, self._run["tile_indices"] >= 0)
 		
 		# Select all newly created segments
 		for name in separated_collection:
 			bpy.data.objects[name].select_set(True)
 		
-		# If no elements remain in the original source, remove it and set the first tile to active
-		if len(mesh_object.data.vertices) == 0:
+		# If no elements remain in the original source, remove it and set the first tile to active (kept sources are just deselected)
+		if self._run["keep_source"] and separated_collection:
+			for source_object in self._run["source_objects"]:
+				source_object.select_set(False)
+			context.view_layer.objects.active = bpy.data.objects[separated_collection[0]]
+		elif len(mesh_object.data.vertices) == 0:
 			bpy.data.meshes.remove(mesh_object.data)
 			context.view_layer.objects.active = bpy.data.objects[separated_collection[0]]
+		add_phase_time(self._run["phases"], "cleanup", phase_start, self._run["profile"])
+		if self._run["tile_index"] is not None:
+			os.makedirs(self._run["index_dir"], exist_ok=True)
+			self.report({'INFO'}, "Tile index written to " + write_tile_index(self._run["index_dir"], bpy.path.clean_name(self._run["run_name"]), self._run["tile_index"], "OBJECTS"))
+		store_last_run(self._run["phases"], len(separated_collection))
+		if self._run["profile"] is not None:
+			self.report({'INFO'}, "Profile report written to " + write_profile_report(self._run["profile"], self._run["phases"], self._run["run_info"]))
 		
-		# Restore original 3D cursor position and pivot point
-		context.scene.cursor.matrix = original_cursor
-		context.tool_settings.transform_pivot_point = original_pivot
+		if self._run["weld_distance"] is not None:
+			self.report({'INFO'}, "Welding and compacting saved " + format_bytes(self._run["saved_bytes"]) + " of vertex and index data")
+		self.report({'INFO'}, "Created " + str(len(separated_collection)) + " tiles in " + "{:.1f}".format(time.perf_counter() - self._run["start_time"]) + "s")
+		self._run = None
 		
 		# Done
 		return {'FINISHED'}
+	
+	def cancel(self, context):
+		# Called on Esc, or by Blender when the modal operator is interrupted (loading a file, closing the window)
+		if not getattr(self, "_run", None):
+			return
+		self.end_modal(context)
+		
+		# Remove every tile created so far along with its mesh data
+		for name in self._run["separated_collection"]:
+			tile_object = bpy.data.objects.get(name)
+			if tile_object:
+				tile_mesh = tile_object.data
+				bpy.data.objects.remove(tile_object)
+				if tile_mesh and tile_mesh.users == 0:
+					bpy.data.meshes.remove(tile_mesh)
+		for collection_name in (self._run["level_collections"] or {}).values():
+			collection = bpy.data.collections.get(collection_name)
+			if collection:
+				bpy.data.collections.remove(collection)
+		
+		# Roll the source back to its original transform and attributes (polygons are only removed from it once every tile is done)
+		if not self._run["keep_source"]:
+			mesh_object = self._run["mesh_object"]
+			mesh_object.data.transform(self._run["original_matrix"].inverted_safe())
+			mesh_object.matrix_world = self._run["original_matrix"]
+			if self._run["island_attributes"]:
+				for attribute_name in ISLAND_ATTRIBUTES:
+					attribute = mesh_object.data.attributes.get(attribute_name)
+					if attribute:
+						mesh_object.data.attributes.remove(attribute)
+			mesh_object.data.update()
+		self._run = None
+	
+	def end_modal(self, context):
+		# Remove the timer and progress display (only present when running modally)
+		if getattr(self, "_timer", None):
+			context.window_manager.event_timer_remove(self._timer)
+			self._timer = None
+			context.window_manager.progress_end()
+			context.workspace.status_text_set(None)
+
+
+
+###########################################################################
+# Run statistics
+
+# Phase timings and tile count of the most recent segmentation run (read by the benchmark suite)
+last_run_stats = {"phases": {}, "tiles": 0}
+
+# Add the time since a phase started to its running total, returning the start time of the next phase
+# When profiling, the change in process memory since the previous phase is added up as well
+def add_phase_time(phases, name, phase_start, profile=None):
+	now = time.perf_counter()
+	phases[name] = phases.get(name, 0.0) + (now - phase_start)
+	if profile is not None:
+		memory = get_process_memory()
+		if memory is not None and profile["memory"] is not None:
+			profile["phase_memory"][name] = profile["phase_memory"].get(name, 0) + memory - profile["memory"]
+		profile["memory"] = memory
+	return now
+
+# Empty profile for collecting memory use and per-tile details
+def new_profile():
+	return {"memory": get_process_memory(), "phase_memory": {}, "tiles": []}
+
+# Source and settings details recorded with a profile report
+def get_run_info(settings, name, arrays_list):
+	return {
+		"object": name,
+		"sources": settings.source_mode,
+		"blend": bpy.data.filepath,
+		"blender": bpy.app.version_string,
+		"created": time.strftime("%Y-%m-%d %H:%M:%S"),
+		"faces": sum(len(arrays["loop_total"]) for arrays in arrays_list),
+		"vertices": sum(len(arrays["co"]) for arrays in arrays_list),
+		"tile_size": list(settings.tile_size),
+		"tile_count": list(settings.tile_count),
+		"tile_bounds": settings.tile_bounds,
+		"tile_segment": settings.tile_segment,
+		"island_engine": settings.island_engine,
+		"tile_origin": settings.tile_origin,
+		"tile_output": settings.tile_output,
+		}
+
+# Print a summary table of a profiled run and write the full report as JSON next to the .blend file (or to the temp folder if unsaved)
+def write_profile_report(profile, phases, info, slowest_count=10):
+	total = sum(phases.values())
+	print("VF Segment Mesh profile: " + info["object"] + ", " + str(info["faces"]) + " faces, " + "{:.3f}".format(total) + "s")
+	print("{:<12}{:>12}{:>9}{:>14}".format("Phase", "Seconds", "Share", "Memory"))
+	for name, seconds in sorted(phases.items(), key=lambda item: item[1], reverse=True):
+		print("{:<12}{:>12.3f}{:>9.1%}{:>14}".format(name, seconds, seconds / total if total > 0.0 else 0.0, format_bytes(profile["phase_memory"].get(name))))
+	
+	# Slowest tiles
+	timed_tiles = [tile for tile in profile["tiles"] if "build" in tile]
+	if timed_tiles:
+		print("{:<32}{:>10}{:>10}{:>12}".format("Slowest tiles", "Faces", "Vertices", "Seconds"))
+		for tile in sorted(timed_tiles, key=lambda tile: tile["build"] + tile["origin"], reverse=True)[:slowest_count]:
+			print("{:<32}{:>10}{:>10}{:>12.4f}".format(tile["name"], tile["faces"], tile["vertices"], tile["build"] + tile["origin"]))
+	
+	report = {
+		"info": info,
+		"total_seconds": total,
+		"peak_rss": get_peak_process_memory(),
+		"phases": {name: {"seconds": seconds, "memory_delta": profile["phase_memory"].get(name)} for name, seconds in phases.items()},
+		"tiles": profile["tiles"],
+		}
+	if bpy.data.filepath:
+		filepath = os.path.splitext(bpy.data.filepath)[0] + "-" + bpy.path.clean_name(info["object"]) + "-segment-profile.json"
+	else:
+		filepath = os.path.join(tempfile.gettempdir(), bpy.path.clean_name(info["object"]) + "-segment-profile.json")
+	with open(filepath, "w") as file:
+		json.dump(report, file, indent=1)
+	return filepath
+
+# Keep the statistics of a finished run
+def store_last_run(phases, tiles):
+	last_run_stats["phases"] = dict(phases)
+	last_run_stats["tiles"] = tiles
+
+
+
+###########################################################################
+# NumPy segmentation engine
+
+# Segment types that place individual polygons by their centre, without island detection (clipped polygons are cut to fit their tile first)
+POLYGON_SEGMENTS = {"POLY", "CLIP"}
+
+# Get the representative position of every polygon, from the polygon centres or the island positions of the selected engine
+def get_polygon_positions(arrays, segment, island_engine="NUMPY"):
+	if segment in POLYGON_SEGMENTS:
+		return get_polygon_centers(arrays)
+	attribute_name = "island_mean" if segment == "AVERAGE" else "island_weighted"
+	if island_engine == "NODES" and "islands" not in arrays:
+		# Precalculated island positions stored as face attributes by the Geometry Nodes modifier
+		return get_attribute_values(arrays, attribute_name)
+	return get_island_positions(arrays)[attribute_name]
+
+# Average vertex location of every polygon, reduced over the loop arrays in bulk and cached with the mesh arrays
+def get_polygon_centers(arrays):
+	if "centers" not in arrays:
+		corner_positions = arrays["co"][arrays["loop_vertex"]].astype(np.float64)
+		arrays["centers"] = np.add.reduceat(corner_positions, arrays["loop_start"], axis=0) / arrays["loop_total"][:, np.newaxis]
+	return arrays["centers"]
+
+# Area of every polygon from the summed cross products of its edges (Newell's method), cached with the mesh arrays
+def get_polygon_areas(arrays):
+	if "areas" not in arrays:
+		loop_positions = arrays["co"][arrays["loop_vertex"]].astype(np.float64)
+		
+		# Index of the next loop within each polygon, wrapping the last loop back to the first
+		next_loops = np.arange(1, len(loop_positions) + 1)
+		next_loops[arrays["loop_start"] + arrays["loop_total"] - 1] = arrays["loop_start"]
+		
+		normals = np.add.reduceat(np.cross(loop_positions, loop_positions[next_loops]), arrays["loop_start"], axis=0)
+		arrays["areas"] = np.linalg.norm(normals, axis=1) * 0.5
+	return arrays["areas"]
+
+# Label connected vertices using a vectorized union-find over the edge array (hooking each edge to its lowest root, then compressing paths)
+def get_vertex_islands(vertex_count, edge_vertices):
+	parent = np.arange(vertex_count, dtype=np.int64)
+	if len(edge_vertices) == 0:
+		return parent
+	a = edge_vertices[:, 0].astype(np.int64)
+	b = edge_vertices[:, 1].astype(np.int64)
+	while True:
+		root_a = parent[a]
+		root_b = parent[b]
+		unresolved = root_a != root_b
+		if not np.any(unresolved):
+			return parent
+		
+		# Hook the higher root of every unresolved edge onto the lower root
+		np.minimum.at(parent, np.maximum(root_a[unresolved], root_b[unresolved]), np.minimum(root_a[unresolved], root_b[unresolved]))
+		
+		# Compress paths until every vertex points directly at its root
+		while True:
+			grandparent = parent[parent]
+			if np.array_equal(grandparent, parent):
+				break
+			parent = grandparent
+
+# Island index, island mean, and area weighted island position for every polygon, computed in memory and cached with the mesh arrays
+def get_island_positions(arrays):
+	if "islands" not in arrays:
+		vertex_count = len(arrays["co"])
+		vertex_roots = get_vertex_islands(vertex_count, arrays["edge_vertices"])
+		roots, vertex_islands = np.unique(vertex_roots, return_inverse=True)
+		vertex_islands = vertex_islands.ravel()
+		island_count = len(roots)
+		
+		# Every vertex of a polygon shares its island, so the first loop is enough
+		face_islands = vertex_islands[arrays["loop_vertex"][arrays["loop_start"]]]
+		
+		# Mean of all vertex positions within each island
+		co = arrays["co"].astype(np.float64)
+		vertex_totals = np.bincount(vertex_islands, minlength=island_count).astype(np.float64)
+		island_mean = np.stack([np.bincount(vertex_islands, weights=co[:, axis], minlength=island_count) for axis in range(3)], axis=1) / vertex_totals[:, np.newaxis]
+		
+		# Polygon centres weighted by polygon area within each island (falls back to the unweighted centre average for zero-area islands)
+		centers = get_polygon_centers(arrays)
+		areas = get_polygon_areas(arrays)
+		area_totals = np.bincount(face_islands, weights=areas, minlength=island_count)
+		weighted_sums = np.stack([np.bincount(face_islands, weights=centers[:, axis] * areas, minlength=island_count) for axis in range(3)], axis=1)
+		face_totals = np.bincount(face_islands, minlength=island_count).astype(np.float64)
+		center_sums = np.stack([np.bincount(face_islands, weights=centers[:, axis], minlength=island_count) for axis in range(3)], axis=1)
+		island_weighted = np.where(
+			area_totals[:, np.newaxis] > 0.0,
+			weighted_sums / np.maximum(area_totals, np.finfo(np.float64).tiny)[:, np.newaxis],
+			center_sums / np.maximum(face_totals, 1.0)[:, np.newaxis])
+		
+		arrays["islands"] = {
+			"island_index": face_islands,
+			"island_mean": island_mean[face_islands],
+			"island_weighted": island_weighted[face_islands],
+			}
+	return arrays["islands"]
+
+# Per-polygon island data, either computed by the NumPy engine or read from the attributes stored by the Geometry Nodes engine
+ISLAND_ATTRIBUTES = ("island_index", "island_mean", "island_weighted")
+
+def get_island_arrays(arrays, island_engine):
+	if island_engine == "NODES" and "islands" not in arrays:
+		return {name: get_attribute_values(arrays, name) for name in ISLAND_ATTRIBUTES}
+	return get_island_positions(arrays)
+
+# Island data of recently segmented meshes keyed by mesh hash, in least recently used order
+island_cache = {}
+
+# Fast hash of the geometry that islands depend on (vertex positions and polygon and edge topology)
+def get_mesh_hash(arrays):
+	mesh_hash = hashlib.blake2b(digest_size=16)
+	for name in ("co", "loop_vertex", "loop_start", "loop_total", "edge_vertices"):
+		mesh_hash.update(np.ascontiguousarray(arrays[name]).tobytes())
+	return mesh_hash.hexdigest()
+
+# Folder for cached island files next to the .blend file (or in the temporary folder if the file hasn't been saved)
+def get_island_cache_dir():
+	if bpy.data.filepath:
+		return os.path.splitext(bpy.data.filepath)[0] + "-island-cache"
+	return os.path.join(tempfile.gettempdir(), "vf-segment-mesh-island-cache")
+
+# Load cached island data into the mesh arrays, returning True if the mesh was found in the cache
+def load_cached_islands(arrays, cache):
+	if cache == "NONE":
+		return False
+	mesh_hash = arrays.setdefault("mesh_hash", get_mesh_hash(arrays))
+	if cache == "MEMORY":
+		if mesh_hash not in island_cache:
+			return False
+		# Move to the end of the eviction order
+		arrays["islands"] = island_cache[mesh_hash] = island_cache.pop(mesh_hash)
+		return True
+	filepath = os.path.join(get_island_cache_dir(), mesh_hash + ".npz")
+	if not os.path.isfile(filepath):
+		return False
+	with np.load(filepath) as islands:
+		arrays["islands"] = {name: islands[name] for name in ISLAND_ATTRIBUTES}
+	os.utime(filepath)
+	return True
+
+# Store the island data of the mesh arrays, evicting the least recently used meshes beyond the limit
+def store_cached_islands(arrays, islands, cache, limit):
+	if cache == "NONE":
+		return
+	mesh_hash = arrays.setdefault("mesh_hash", get_mesh_hash(arrays))
+	if cache == "MEMORY":
+		island_cache[mesh_hash] = islands
+		while len(island_cache) > limit:
+			island_cache.pop(next(iter(island_cache)))
+		return
+	cache_dir = get_island_cache_dir()
+	os.makedirs(cache_dir, exist_ok=True)
+	np.savez(os.path.join(cache_dir, mesh_hash + ".npz"), **islands)
+	cached_files = sorted(glob.glob(os.path.join(cache_dir, "*.npz")), key=os.path.getmtime)
+	for filepath in cached_files[:max(len(cached_files) - limit, 0)]:
+		os.remove(filepath)
+
+# Assign each element position to a flattened tile index (x * countY + y), or -1 if it falls outside the grid
+def get_tile_indices(positions, start, size, count, bounds):
+	start = np.asarray(start, dtype=np.float64)
+	size = np.asarray(size, dtype=np.float64)
+	count = np.asarray(count, dtype=np.int64)
+	
+	# Floor divide XY positions into integer grid coordinates
+	xy = positions[:, :2].astype(np.float64)
+	grid = np.floor((xy - start) / size).astype(np.int64)
+	
+	if bounds:
+		# Extend edge tiles to include everything beyond the grid
+		grid = np.clip(grid, 0, count - 1)
+		inside = np.ones(len(grid), dtype=bool)
+	else:
+		# Tile boundaries are inclusive, so elements sitting exactly on the far edge of the grid belong to the last tile
+		grid = np.where(xy == start + size * count, count - 1, grid)
+		inside = np.all((grid >= 0) & (grid < count), axis=1)
+	
+	return np.where(inside, grid[:, 0] * count[1] + grid[:, 1], -1)
+
+# Grid start, tile size and tile count from the settings (the grid is centred on the world origin)
+def get_settings_grid(settings):
+	size = (settings.tile_size[0], settings.tile_size[1])
+	count = (settings.tile_count[0], settings.tile_count[1])
+	start = (settings.grid_center[0] - size[0] * float(count[0]) * 0.5, settings.grid_center[1] - size[1] * float(count[1]) * 0.5)
+	return start, size, count
+
+# Number of histogram bins along the longest side of the mesh bounds when fitting a grid
+GRID_FIT_RESOLUTION = 512
+
+# Largest fitted tile count along either axis, matching the limit of the Count setting so fitted grids can be saved to it unchanged
+GRID_FIT_MAX_COUNT = 64
+
+# Heaviest block of k x k histogram bins, with the blocks aligned to the first bin
+def get_max_block(histogram, k):
+	padded = np.pad(histogram, ((0, -histogram.shape[0] % k), (0, -histogram.shape[1] % k)))
+	return padded.reshape(padded.shape[0] // k, k, padded.shape[1] // k, k).sum(axis=(1, 3)).max()
+
+# Solve for the grid start, square tile size, and tile count that cover every position while keeping the summed weight of each tile within the budget
+# Weights are binned once into a histogram over the bounds, so every candidate tile size (a whole number of bins) is tested without revisiting the positions
+# Returns the grid and the weight of its heaviest tile, which only exceeds the budget when a single bin is already over it or the budget needs more tiles than the count limit
+def fit_grid(positions, weights, budget, resolution=GRID_FIT_RESOLUTION, max_count=GRID_FIT_MAX_COUNT):
+	if len(positions) == 0:
+		return (-0.5, -0.5), (1.0, 1.0), (1, 1), 0.0
+	xy = positions[:, :2].astype(np.float64)
+	low = xy.min(axis=0)
+	extent = xy.max(axis=0) - low
+	
+	# Bins are slightly larger than the bounds divided by the resolution, so positions on the far edge stay inside the last bin
+	bin_size = max(float(extent.max()), 1e-6) * (1.0 + 1e-6) / resolution
+	bins = np.minimum((extent / bin_size).astype(np.int64) + 1, resolution)
+	cells = np.minimum(((xy - low) / bin_size).astype(np.int64), bins - 1)
+	histogram = np.bincount(cells[:, 0] * bins[1] + cells[:, 1], weights=weights, minlength=int(bins[0] * bins[1])).reshape(bins)
+	
+	# Binary search for the largest tile whose heaviest block is within the budget, starting from the smallest tile that stays within the count limit
+	low_k, high_k = int(-(-bins.max() // max_count)), int(bins.max())
+	while low_k < high_k:
+		k = (low_k + high_k + 1) // 2
+		if get_max_block(histogram, k) <= budget:
+			low_k = k
+		else:
+			high_k = k - 1
+	
+	size = low_k * bin_size
+	count = (int(-(-bins[0] // low_k)), int(-(-bins[1] // low_k)))
+	return (float(low[0]), float(low[1])), (size, size), count, float(get_max_block(histogram, low_k))
+
+# Name suffix, centre, bounds and quadtree level of a single grid cell (level 0 cells are the tiles of the flat grid)
+def get_grid_cell(start, size, level, x, y):
+	cell_size = (size[0] / (1 << level), size[1] / (1 << level))
+	min_x = start[0] + x * cell_size[0]
+	min_y = start[1] + y * cell_size[1]
+	
+	# Deeper cells keep the name of their level 0 tile, followed by one quadrant digit (0-3) per level
+	suffix = str(x >> level) + "-" + str(y >> level)
+	if level > 0:
+		suffix += "-" + "".join(str(((x >> bit) & 1) + 2 * ((y >> bit) & 1)) for bit in reversed(range(level)))
+	
+	return {
+		"suffix": suffix,
+		"center": (min_x + cell_size[0] * 0.5, min_y + cell_size[1] * 0.5, 0.0),
+		"bounds": (min_x, min_y, min_x + cell_size[0], min_y + cell_size[1]),
+		"level": level,
+		}
+
+# Tile layout of the flat grid, keyed by flattened tile index
+def get_grid_layout(start, size, count):
+	return {x * count[1] + y: get_grid_cell(start, size, 0, x, y) for x in range(count[0]) for y in range(count[1])}
+
+# Name of a tile from its layout entry
+def get_tile_name(base_name, layout, tile):
+	return base_name + "-Tile-" + layout[tile]["suffix"]
+
+# Estimated size of each polygon in bytes (per corner index, position, normal and UV)
+ESTIMATED_CORNER_BYTES = 36
+
+# Weight of every polygon when measuring tiles against a budget, as a face count, estimated vertex count (one per face corner), or estimated bytes
+def get_face_weights(arrays, unit):
+	if unit == "BYTES":
+		return arrays["loop_total"].astype(np.float64) * ESTIMATED_CORNER_BYTES
+	if unit == "VERTICES":
+		return arrays["loop_total"].astype(np.float64)
+	return np.ones(len(arrays["loop_total"]), dtype=np.float64)
+
+# Recursively split grid tiles into quadtree cells until every cell is within the budget or the maximum depth is reached
+# Returns the leaf tile index of every polygon, the leaf layout, and (when requested) the polygons of every subdivided cell for coarse LOD tiles
+def get_quadtree_tiles(positions, tile_indices, weights, start, size, count, budget, max_depth, lod=False):
+	start_array = np.asarray(start, dtype=np.float64)
+	size_array = np.asarray(size, dtype=np.float64)
+	xy = positions[:, :2].astype(np.float64)
+	valid = tile_indices >= 0
+	level = np.zeros(len(tile_indices), dtype=np.int64)
+	gx, gy = np.divmod(np.where(valid, tile_indices, 0).astype(np.int64), int(count[1]))
+	
+	# Subdivide one level at a time, moving every polygon of an over-budget cell into one of its four children
+	split_cells = []
+	for depth in range(max_depth):
+		active = np.flatnonzero(valid & (level == depth))
+		if len(active) == 0:
+			break
+		rows = int(count[1]) << depth
+		cells, inverse = np.unique(gx[active] * rows + gy[active], return_inverse=True)
+		inverse = inverse.ravel()
+		over = np.bincount(inverse, weights=weights[active], minlength=len(cells)) > budget
+		if not np.any(over):
+			break
+		split_cells.extend((depth, int(cell // rows), int(cell % rows)) for cell in cells[over])
+		faces = active[over[inverse]]
+		
+		# Clamp to the parent cell, so polygons outside the grid (extended edges) stay within their tile
+		child = np.floor((xy[faces] - start_array) / (size_array / (1 << (depth + 1)))).astype(np.int64)
+		gx[faces] = np.clip(child[:, 0], gx[faces] * 2, gx[faces] * 2 + 1)
+		gy[faces] = np.clip(child[:, 1], gy[faces] * 2, gy[faces] * 2 + 1)
+		level[faces] = depth + 1
+	
+	# Number the leaf cells
+	leaves, leaf_inverse = np.unique(np.stack((level, gx, gy), axis=1)[valid], axis=0, return_inverse=True)
+	leaf_indices = np.full(len(tile_indices), -1, dtype=np.int64)
+	leaf_indices[valid] = leaf_inverse.ravel()
+	layout = {index: get_grid_cell(start, size, int(leaf[0]), int(leaf[1]), int(leaf[2])) for index, leaf in enumerate(leaves)}
+	
+	# Coarse LOD tiles contain every polygon below a subdivided cell
+	lod_tiles = []
+	if lod:
+		for cell_level, cell_x, cell_y in split_cells:
+			below = valid & (level > cell_level)
+			shift = np.maximum(level - cell_level, 0)
+			faces = np.flatnonzero(below & ((gx >> shift) == cell_x) & ((gy >> shift) == cell_y))
+			tile = len(layout)
+			layout[tile] = get_grid_cell(start, size, cell_level, cell_x, cell_y)
+			layout[tile]["suffix"] += "-LOD"
+			layout[tile]["lod"] = True
+			lod_tiles.append((tile, faces))
+	
+	return leaf_indices, layout, lod_tiles
+
+# Read a face, point, or corner attribute as one value per polygon (from the first corner of each polygon for point and corner attributes)
+# The island index can also be used without stored attributes, using the islands found by the NumPy engine (None for attributes that aren't read, such as internal ones)
+def get_face_attribute(arrays, attribute_name):
+	for name, domain, data_type, values in arrays["attributes"]:
+		if name != attribute_name:
+			continue
+		if domain == 'FACE':
+			return values
+		if domain == 'POINT':
+			return values[arrays["loop_vertex"][arrays["loop_start"]]]
+		if domain == 'CORNER':
+			return values[arrays["loop_start"]]
+	
+	# Built-in attributes and UV maps are read into their own arrays instead of the generic attributes
+	if attribute_name == "material_index":
+		return arrays["material_index"]
+	if attribute_name == "sharp_face":
+		return ~arrays["use_smooth"]
+	if attribute_name == "position":
+		return arrays["co"][arrays["loop_vertex"][arrays["loop_start"]]]
+	for name, active_render, uvs in arrays["uv_layers"]:
+		if name == attribute_name:
+			return uvs[arrays["loop_start"]]
+	if attribute_name == "island_index":
+		return get_island_positions(arrays)["island_index"]
+	return None
+
+# Check that a source object has the attribute or vertex groups used to assign tiles
+def has_tile_key(source_object, settings):
+	if settings.tile_assign == "VERTEX_GROUP":
+		return len(source_object.vertex_groups) > 0
+	if settings.tile_assign == "ATTRIBUTE":
+		attribute = source_object.data.attributes.get(settings.tile_key)
+		return settings.tile_key == "island_index" or (attribute is not None and not attribute.name.startswith(".") and attribute.domain != 'EDGE' and attribute.data_type in ATTRIBUTE_TYPES)
+	return True
+
+# Key of every polygon (-1 for none) and the label of each key, from the distinct values of a face attribute or the vertex group with the most weight on each polygon
+def get_face_keys(arrays, assign, key_name):
+	face_count = len(arrays["loop_total"])
+	if assign == "VERTEX_GROUP":
+		if arrays["weights"] is None:
+			return np.full(face_count, -1, dtype=np.int64), []
+		
+		# Sum the weights of every corner by polygon and group, only for the groups each vertex is in
+		weights = sort_vertex_weights(arrays["weights"])
+		corners, entries = get_vertex_weight_entries(weights, arrays["loop_vertex"])
+		corner_faces = np.repeat(np.arange(face_count), arrays["loop_total"])
+		faces, groups, sums = sum_element_weights(corner_faces[corners], weights[1][entries], weights[2][entries], len(arrays["vertex_groups"]))
+		
+		# The heaviest group of each polygon is its last entry ordered by weight (the lowest group wins ties)
+		order = np.lexsort((-groups, sums, faces))
+		heaviest = order[np.append(np.diff(faces[order]) != 0, True)] if len(order) else order
+		heaviest = heaviest[sums[heaviest] > 0.0]
+		keys = np.full(face_count, -1, dtype=np.int64)
+		keys[faces[heaviest]] = groups[heaviest]
+		return keys, list(arrays["vertex_groups"])
+	values = get_face_attribute(arrays, key_name)
+	values, keys = np.unique(np.asarray(values).reshape(face_count, -1), axis=0, return_inverse=True)
+	format_value = lambda value: str(value.item()) if not np.issubdtype(value.dtype, np.floating) else np.format_float_positional(value, trim='-')
+	return keys.ravel(), [key_name + "-" + "_".join(format_value(value) for value in row) for row in values]
+
+# Combine the keys of several sources into shared keys, matched by label
+def merge_face_keys(face_keys):
+	label_keys = {}
+	for keys, key_labels in face_keys:
+		for label in key_labels:
+			label_keys.setdefault(label, len(label_keys))
+	merged = [np.append(np.array([label_keys[label] for label in key_labels], dtype=np.int64), -1)[keys] for keys, key_labels in face_keys]
+	return np.concatenate(merged), list(label_keys)
+
+# Largest gap between the bounds of neighbouring tiles that can be merged, relative to the size of the smaller tile
+BALANCE_GAP = 0.05
+
+# Layout entry for part of a tile, with its bounds and centre
+def get_tile_part_cell(cell, bounds, suffix):
+	return dict(cell, suffix=suffix, bounds=tuple(bounds), center=((bounds[0] + bounds[2]) * 0.5, (bounds[1] + bounds[3]) * 0.5, 0.0))
+
+# Tile index of every polygon and the tile layout when polygons are grouped by key, with each tile bounding the element positions of its polygons
+def get_key_tiles(positions, keys, labels):
+	valid = keys >= 0
+	used, inverse = np.unique(keys[valid], return_inverse=True)
+	tile_indices = np.full(len(keys), -1, dtype=np.int64)
+	tile_indices[valid] = inverse.ravel()
+	lows = np.full((len(used), 2), np.inf)
+	highs = np.full((len(used), 2), -np.inf)
+	np.minimum.at(lows, tile_indices[valid], positions[valid, :2])
+	np.maximum.at(highs, tile_indices[valid], positions[valid, :2])
+	layout = {}
+	for tile, key in enumerate(used):
+		layout[tile] = get_tile_part_cell({"level": 0}, np.concatenate((lows[tile], highs[tile])).tolist(), bpy.path.clean_name(labels[key]))
+	return tile_indices, layout
+
+# Pairs of neighbouring boxes (first index lower) that share part of an edge, allowing a small gap between the element bounds of keyed tiles
+# Boxes are hashed into the cells of a grid the size of a typical box that they overlap, so only boxes sharing a cell are tested instead of every pair
+def get_neighbour_pairs(bounds):
+	sizes = np.max(bounds[:, 2:] - bounds[:, :2], axis=1)
+	gaps = np.maximum(sizes * BALANCE_GAP, 1e-6)[:, np.newaxis]
+	cell_size = max(float(np.median(sizes)) if len(sizes) else 0.0, 1e-6) * (1.0 + BALANCE_GAP) * 2.0
+	low = np.floor((bounds[:, :2] - gaps) / cell_size).astype(np.int64)
+	spans = np.floor((bounds[:, 2:] + gaps) / cell_size).astype(np.int64) - low + 1
+	
+	# Every cell each box covers, grouped by cell
+	counts = spans[:, 0] * spans[:, 1]
+	boxes = np.repeat(np.arange(len(bounds)), counts)
+	offsets = np.arange(len(boxes)) - np.repeat(np.cumsum(counts) - counts, counts)
+	cells = np.column_stack((low[boxes, 0] + offsets // spans[boxes, 1], low[boxes, 1] + offsets % spans[boxes, 1]))
+	order = np.lexsort((boxes, cells[:, 1], cells[:, 0]))
+	boxes, cells = boxes[order], cells[order]
+	cell_ends = np.flatnonzero(np.any(np.diff(cells, axis=0) != 0, axis=1)) + 1
+	group_ends = np.repeat(np.append(cell_ends, len(boxes)), np.diff(np.concatenate(([0], cell_ends, [len(boxes)]))))
+	
+	# Pair each box with the boxes after it in the same cell, keeping each pair once
+	pair_counts = group_ends - np.arange(len(boxes)) - 1
+	first = np.repeat(np.arange(len(boxes)), pair_counts)
+	second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+	pairs = np.unique(np.column_stack((boxes[first], boxes[second])), axis=0).reshape(-1, 2)
+	first, second = pairs[:, 0], pairs[:, 1]
+	
+	gaps = np.maximum(bounds[first, :2], bounds[second, :2]) - np.minimum(bounds[first, 2:], bounds[second, 2:])
+	tolerance = np.maximum(np.minimum(sizes[first], sizes[second]) * BALANCE_GAP, 1e-6)
+	touching = (gaps.max(axis=1) <= tolerance) & (gaps.min(axis=1) < -tolerance)
+	return first[touching], second[touching]
+
+# Balance tiles against a budget: tiles over it are split in two at the weighted median of their element positions along their longest axis (every over-full tile in each round at once)
+# Neighbouring tiles (sharing part of an edge, up to a small gap) that fit within the budget together are then merged, lightest pairs first
+# Elements at the same position are never separated, so tiles of a single island or position stay over the budget
+def balance_tiles(positions, tile_indices, weights, layout, budget):
+	xy = positions[:, :2].astype(np.float64)
+	tile_indices = tile_indices.copy()
+	layout = dict(layout)
+	valid = tile_indices >= 0
+	fixed = np.zeros(0, dtype=np.int64)
+	while True:
+		tile_count = max(layout, default=-1) + 1
+		tile_weights = np.bincount(tile_indices[valid], weights=weights[valid], minlength=tile_count)
+		over = np.setdiff1d(np.flatnonzero(tile_weights > budget), fixed)
+		if len(over) == 0:
+			break
+		
+		# Sort the elements of every over-full tile along the longest axis of its bounds, in one sort keyed by tile and then by the position within the tile
+		faces = np.flatnonzero(valid & np.isin(tile_indices, over))
+		face_tiles = tile_indices[faces]
+		bounds = np.zeros((tile_count, 4))
+		bounds[over] = [layout[tile]["bounds"] for tile in over]
+		spans = bounds[:, 2:] - bounds[:, :2]
+		axes = np.argmax(spans, axis=1)
+		lows = bounds[np.arange(tile_count), axes]
+		spans = np.maximum(spans.max(axis=1), 1e-12)
+		coordinates = xy[faces, axes[face_tiles]]
+		order = np.argsort(face_tiles + np.clip((coordinates - lows[face_tiles]) / spans[face_tiles], 0.0, 1.0) * 0.5)
+		faces, face_tiles, coordinates = faces[order], face_tiles[order], coordinates[order]
+		
+		# Split at the coordinate where the running weight of each tile passes half of its total
+		starts = np.searchsorted(face_tiles, over)
+		running = np.cumsum(weights[faces])
+		running -= np.repeat(running[starts] - weights[faces[starts]], np.diff(np.append(starts, len(faces))))
+		median = np.full(tile_count, np.nan)
+		np.fmin.at(median, face_tiles[running >= tile_weights[face_tiles] * 0.5], coordinates[running >= tile_weights[face_tiles] * 0.5])
+		upper = coordinates > median[face_tiles]
+		
+		# Elements at the median go up instead when nothing is above it, and tiles where every element shares one position can't be split
+		empty = np.bincount(face_tiles[upper], minlength=tile_count) == 0
+		upper |= empty[face_tiles] & (coordinates >= median[face_tiles])
+		lower_counts = np.bincount(face_tiles[~upper], minlength=tile_count)
+		unsplit = over[lower_counts[over] == 0]
+		fixed = np.union1d(fixed, unsplit)
+		upper &= ~np.isin(face_tiles, unsplit)
+		
+		# The lower part keeps the tile index, the upper part becomes a new tile
+		split_tiles = np.setdiff1d(over, unsplit)
+		new_tiles = np.full(tile_count, -1, dtype=np.int64)
+		new_tiles[split_tiles] = tile_count + np.arange(len(split_tiles))
+		tile_indices[faces[upper]] = new_tiles[face_tiles[upper]]
+		for tile in split_tiles:
+			axis = int(axes[tile])
+			cell = layout[tile]
+			lower_bounds = list(cell["bounds"])
+			upper_bounds = list(cell["bounds"])
+			lower_bounds[axis + 2] = upper_bounds[axis] = float(median[tile])
+			layout[int(new_tiles[tile])] = get_tile_part_cell(cell, upper_bounds, cell["suffix"] + "b")
+			layout[tile] = get_tile_part_cell(cell, lower_bounds, cell["suffix"] + "a")
+	
+	# Merge rounds pair up neighbouring tiles that fit together, each tile joining at most one pair per round
+	while True:
+		tile_count = max(layout, default=-1) + 1
+		tile_weights = np.bincount(tile_indices[valid], weights=weights[valid], minlength=tile_count)
+		tiles = np.array([tile for tile in np.flatnonzero(tile_weights > 0) if not layout[tile].get("lod")], dtype=np.int64)
+		tiles = tiles[tile_weights[tiles] <= budget * 0.5]
+		first, second = get_neighbour_pairs(np.array([layout[tile]["bounds"] for tile in tiles], dtype=np.float64).reshape(-1, 4))
+		combined = tile_weights[tiles[first]] + tile_weights[tiles[second]]
+		fits = combined <= budget
+		first, second, combined = first[fits], second[fits], combined[fits]
+		if len(first) == 0:
+			break
+		
+		merged = np.arange(tile_count)
+		paired = set()
+		for pair in np.argsort(combined, kind='stable'):
+			keep, remove = int(tiles[first[pair]]), int(tiles[second[pair]])
+			if keep in paired or remove in paired:
+				continue
+			paired.update((keep, remove))
+			merged[remove] = keep
+			keep_bounds, remove_bounds = layout[keep]["bounds"], layout.pop(remove)["bounds"]
+			union = (min(keep_bounds[0], remove_bounds[0]), min(keep_bounds[1], remove_bounds[1]), max(keep_bounds[2], remove_bounds[2]), max(keep_bounds[3], remove_bounds[3]))
+			parts = layout[keep].get("parts", 1) + 1
+			layout[keep] = dict(get_tile_part_cell(layout[keep], union, layout[keep]["suffix"].split("+")[0] + "+" + str(parts - 1)), parts=parts)
+		tile_indices[valid] = merged[tile_indices[valid]]
+	return tile_indices, layout
+
+# Attribute value field, component count, and NumPy type name for each generic attribute data type (names, so NumPy isn't loaded when the add-on is enabled)
+ATTRIBUTE_TYPES = {
+	'FLOAT': ("value", 1, "float32"),
+	'INT': ("value", 1, "int32"),
+	'INT8': ("value", 1, "int8"),
+	'INT32_2D': ("value", 2, "int32"),
+	'BOOLEAN': ("value", 1, "bool"),
+	'FLOAT2': ("vector", 2, "float32"),
+	'FLOAT_VECTOR': ("vector", 3, "float32"),
+	'FLOAT_COLOR': ("color", 4, "float32"),
+	'BYTE_COLOR': ("color", 4, "float32"),
+	'QUATERNION': ("value", 4, "float32"),
+	}
+
+# Attributes that are written through the dedicated mesh properties instead of the generic attribute API
+BUILTIN_ATTRIBUTES = {"position", "material_index", "sharp_face"}
+
+# Read a property from every element of a collection in one call
+def foreach_get_array(collection, field, width=1, dtype="float32"):
+	values = np.empty(len(collection) * width, dtype=dtype)
+	collection.foreach_get(field, values)
+	return values.reshape(-1, width) if width > 1 else values
+
+# Transform the positions and custom normals of mesh arrays by a 4x4 matrix
+# Normals use the inverse transpose, so they stay perpendicular to the surface under non-uniform scale
+def transform_mesh_arrays(arrays, matrix):
+	matrix = np.array(matrix, dtype=np.float64)
+	arrays["co"] = (arrays["co"] @ matrix[:3, :3].T + matrix[:3, 3]).astype(np.float32)
+	if arrays["normals"] is not None:
+		normals = arrays["normals"] @ np.linalg.pinv(matrix[:3, :3])
+		arrays["normals"] = (normals / np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)).astype(np.float32)
+
+# Gather all vertex, loop, polygon, edge and attribute data needed to rebuild tiles in bulk
+# World space arrays are transformed in memory by the object's matrix, leaving the object untouched
+def read_mesh_arrays(mesh_object, world_space=False):
+	mesh_data = mesh_object.data
+	arrays = {
+		"co": foreach_get_array(mesh_data.vertices, "co", 3),
+		"loop_vertex": foreach_get_array(mesh_data.loops, "vertex_index", 1, np.int32),
+		"loop_start": foreach_get_array(mesh_data.polygons, "loop_start", 1, np.int32),
+		"loop_total": foreach_get_array(mesh_data.polygons, "loop_total", 1, np.int32),
+		"material_index": foreach_get_array(mesh_data.polygons, "material_index", 1, np.int32),
+		"use_smooth": foreach_get_array(mesh_data.polygons, "use_smooth", 1, bool),
+		"use_seam": foreach_get_array(mesh_data.edges, "use_seam", 1, bool),
+		"materials": list(mesh_data.materials),
+		"attributes": [],
+		"uv_layers": [],
+		"uv_active": mesh_data.uv_layers.active_index,
+		"normals": None,
+		"vertex_groups": [group.name for group in mesh_object.vertex_groups],
+		"weights": None,
+		}
+	
+	# Sorted edge keys allow edges rebuilt from polygons to be matched back to their source edge
+	edge_vertices = np.sort(foreach_get_array(mesh_data.edges, "vertices", 2, np.int32), axis=1).astype(np.int64)
+	edge_keys = edge_vertices[:, 0] * len(mesh_data.vertices) + edge_vertices[:, 1]
+	arrays["edge_vertices"] = edge_vertices
+	arrays["edge_order"] = np.argsort(edge_keys)
+	arrays["edge_keys"] = edge_keys[arrays["edge_order"]]
+	
+	# UV maps
+	for uv_layer in mesh_data.uv_layers:
+		arrays["uv_layers"].append((uv_layer.name, uv_layer.active_render, foreach_get_array(uv_layer.data, "uv", 2)))
+	uv_names = {uv_layer.name for uv_layer in mesh_data.uv_layers}
+	
+	# Generic attributes (internal attributes prefixed with "." are managed by Blender)
+	for attribute in mesh_data.attributes:
+		if attribute.name.startswith(".") or attribute.name in BUILTIN_ATTRIBUTES or attribute.name in uv_names or attribute.data_type not in ATTRIBUTE_TYPES:
+			continue
+		field, width, dtype = ATTRIBUTE_TYPES[attribute.data_type]
+		arrays["attributes"].append((attribute.name, attribute.domain, attribute.data_type, foreach_get_array(attribute.data, field, width, dtype)))
+	
+	# Custom split normals
+	if mesh_data.has_custom_normals:
+		if hasattr(mesh_data, "calc_normals_split"):
+			mesh_data.calc_normals_split()
+		arrays["normals"] = foreach_get_array(mesh_data.loops, "normal", 3)
+	
+	# Vertex group weights are not exposed as attributes, so they are read element by element (only when groups exist)
+	if arrays["vertex_groups"]:
+		weights = [(vertex.index, element.group, element.weight) for vertex in mesh_data.vertices for element in vertex.groups]
+		arrays["weights"] = (
+			np.array([weight[0] for weight in weights], dtype=np.int64),
+			np.array([weight[1] for weight in weights], dtype=np.int64),
+			np.array([weight[2] for weight in weights], dtype=np.float32))
+	
+	if world_space:
+		transform_mesh_arrays(arrays, mesh_object.matrix_world)
+	return arrays
+
+# Mesh objects segmented in one run: the active object, every selected mesh (active first), or every mesh in a collection and its children
+def get_source_objects(context, settings):
+	if settings.source_mode == "SELECTED":
+		objects = sorted(context.selected_objects, key=lambda obj: obj != context.active_object)
+	elif settings.source_mode == "COLLECTION":
+		objects = list(settings.source_collection.all_objects) if settings.source_collection else []
+	else:
+		objects = [context.active_object] if context.active_object else []
+	return [obj for obj in objects if obj.type == 'MESH' and len(obj.data.polygons) > 0]
+
+# Concatenate the bulk arrays of several meshes into one set of arrays, as if they were a single mesh
+# Materials, UV maps, attributes, and vertex groups are matched by name, and elements of meshes without them are filled with zeros
+def merge_mesh_arrays(arrays_list):
+	vertex_offsets = np.cumsum([0] + [len(arrays["co"]) for arrays in arrays_list])
+	loop_offsets = np.cumsum([0] + [len(arrays["loop_vertex"]) for arrays in arrays_list])
+	merged = {
+		"co": np.concatenate([arrays["co"] for arrays in arrays_list]),
+		"loop_vertex": np.concatenate([arrays["loop_vertex"] + offset for arrays, offset in zip(arrays_list, vertex_offsets)]).astype(np.int32),
+		"loop_start": np.concatenate([arrays["loop_start"] + offset for arrays, offset in zip(arrays_list, loop_offsets)]).astype(np.int32),
+		"loop_total": np.concatenate([arrays["loop_total"] for arrays in arrays_list]),
+		"use_smooth": np.concatenate([arrays["use_smooth"] for arrays in arrays_list]),
+		"use_seam": np.concatenate([arrays["use_seam"] for arrays in arrays_list]),
+		"materials": [],
+		"attributes": [],
+		"uv_layers": [],
+		"uv_active": 0,
+		"normals": None,
+		"vertex_groups": [],
+		"weights": None,
+		}
+	
+	# Material indices are remapped into a shared material list (meshes without materials use an empty slot)
+	material_index = []
+	for arrays in arrays_list:
+		remap = []
+		for material in arrays["materials"] or [None]:
+			if material not in merged["materials"]:
+				merged["materials"].append(material)
+			remap.append(merged["materials"].index(material))
+		material_index.append(np.asarray(remap, dtype=np.int32)[np.clip(arrays["material_index"], 0, len(remap) - 1)])
+	merged["material_index"] = np.concatenate(material_index)
+	
+	# Edges keep their source order, with keys rebuilt for the merged vertex indices
+	edge_vertices = np.concatenate([arrays["edge_vertices"] + offset for arrays, offset in zip(arrays_list, vertex_offsets)])
+	edge_keys = edge_vertices[:, 0] * len(merged["co"]) + edge_vertices[:, 1]
+	merged["edge_vertices"] = edge_vertices
+	merged["edge_order"] = np.argsort(edge_keys)
+	merged["edge_keys"] = edge_keys[merged["edge_order"]]
+	
+	# UV maps, with the active map of the first mesh staying active
+	uv_names = []
+	for arrays in arrays_list:
+		uv_names += [uv_name for uv_name, uv_render, uv_values in arrays["uv_layers"] if uv_name not in uv_names]
+	for uv_name in uv_names:
+		layers = [{name: (render, values) for name, render, values in arrays["uv_layers"]}.get(uv_name) for arrays in arrays_list]
+		uv_values = [layer[1] if layer else np.zeros((len(arrays["loop_vertex"]), 2), dtype=np.float32) for arrays, layer in zip(arrays_list, layers)]
+		merged["uv_layers"].append((uv_name, any(layer[0] for layer in layers if layer), np.concatenate(uv_values)))
+	first_layers = arrays_list[0]["uv_layers"]
+	if first_layers:
+		merged["uv_active"] = uv_names.index(first_layers[arrays_list[0]["uv_active"]][0])
+	
+	# Generic attributes, matched by name, domain, and type
+	attribute_keys = []
+	for arrays in arrays_list:
+		attribute_keys += [(name, domain, data_type) for name, domain, data_type, values in arrays["attributes"] if (name, domain, data_type) not in attribute_keys]
+	for name, domain, data_type in attribute_keys:
+		field, width, dtype = ATTRIBUTE_TYPES[data_type]
+		attribute_values = []
+		for arrays in arrays_list:
+			values = {attribute[:3]: attribute[3] for attribute in arrays["attributes"]}.get((name, domain, data_type))
+			if values is None:
+				size = {'POINT': len(arrays["co"]), 'EDGE': len(arrays["edge_vertices"]), 'FACE': len(arrays["loop_total"]), 'CORNER': len(arrays["loop_vertex"])}[domain]
+				values = np.zeros((size, width) if width > 1 else size, dtype=dtype)
+			attribute_values.append(values)
+		merged["attributes"].append((name, domain, data_type, np.concatenate(attribute_values)))
+	
+	# Custom split normals are only kept when every mesh has them
+	if all(arrays["normals"] is not None for arrays in arrays_list):
+		merged["normals"] = np.concatenate([arrays["normals"] for arrays in arrays_list])
+	
+	# Vertex group weights, with group indices remapped into a shared group list
+	weights = []
+	for arrays, offset in zip(arrays_list, vertex_offsets):
+		merged["vertex_groups"] += [name for name in arrays["vertex_groups"] if name not in merged["vertex_groups"]]
+		if arrays["weights"] is not None:
+			remap = np.array([merged["vertex_groups"].index(name) for name in arrays["vertex_groups"]], dtype=np.int64)
+			weights.append((arrays["weights"][0] + offset, remap[arrays["weights"][1]], arrays["weights"][2]))
+	if weights:
+		merged["weights"] = tuple(np.concatenate(values) for values in zip(*weights))
+	
+	return merged
+
+# Sort sparse vertex weights (vertex, group, and weight arrays) by vertex and group, so the weights of each vertex are one contiguous run
+def sort_vertex_weights(weights):
+	order = np.lexsort((weights[1], weights[0]))
+	return tuple(values[order] for values in weights)
+
+# Weight entries of each listed vertex, as the position in the list each entry belongs to and the entry index (weights sorted by vertex)
+def get_vertex_weight_entries(weights, vertices):
+	starts = np.searchsorted(weights[0], vertices, side='left')
+	counts = np.searchsorted(weights[0], vertices, side='right') - starts
+	owners = np.repeat(np.arange(len(vertices)), counts)
+	entries = np.repeat(starts, counts) + np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+	return owners, entries
+
+# Sum weights by element and group, returning element, group, and summed weight arrays sorted by element and group
+def sum_element_weights(elements, groups, values, group_count):
+	group_count = max(group_count, 1)
+	keys, inverse = np.unique(elements.astype(np.int64) * group_count + groups, return_inverse=True)
+	return keys // group_count, keys % group_count, np.bincount(inverse.ravel(), weights=values, minlength=len(keys))
+
+# Find the stored values of a generic attribute by name
+def get_attribute_values(arrays, attribute_name):
+	for name, domain, data_type, values in arrays["attributes"]:
+		if name == attribute_name:
+			return values
+	raise KeyError(attribute_name)
+
+# Yield each non-empty tile with the sorted indices of the polygons assigned to it
+def get_tile_faces(tile_indices):
+	order = np.argsort(tile_indices, kind='stable')
+	tiles, starts, counts = np.unique(tile_indices[order], return_index=True, return_counts=True)
+	for tile, start, count in zip(tiles, starts, counts):
+		if tile >= 0:
+			yield int(tile), order[start:start + count]
+
+# Split tile entries of polygons from several concatenated sources into per-source entries with local polygon indices
+def split_source_tiles(tiles, face_offsets):
+	source_tiles = []
+	for tile, faces in tiles:
+		sources = np.searchsorted(face_offsets, faces, 'right') - 1
+		for source in np.unique(sources):
+			source_tiles.append((tile, faces[sources == source] - face_offsets[source], int(source)))
+	return source_tiles
+
+# Expand polygon loop ranges into a flat array of loop indices, along with the compacted loop start of each polygon
+def get_face_loops(loop_start, loop_total):
+	compact_start = np.cumsum(loop_total) - loop_total
+	loops = np.arange(int(loop_total.sum())) - np.repeat(compact_start, loop_total) + np.repeat(loop_start, loop_total)
+	return loops, compact_start
+
+# Slice the loops and vertices used by a set of polygons and remap them to compact tile-local indices
+def get_tile_geometry(arrays, faces):
+	loop_total = arrays["loop_total"][faces]
+	loops, loop_start = get_face_loops(arrays["loop_start"][faces], loop_total)
+	vertices, loop_vertex = np.unique(arrays["loop_vertex"][loops], return_inverse=True)
+	return {
+		"faces": faces,
+		"loops": loops,
+		"vertices": vertices,
+		"loop_start": loop_start.astype(np.int32),
+		"loop_total": loop_total.astype(np.int32),
+		"loop_vertex": loop_vertex.astype(np.int32).ravel(),
+		}
+
+# Interleave the low 16 bits of two integer arrays into Morton (Z-order) codes
+def get_morton_codes(x, y):
+	codes = []
+	for values in (x, y):
+		values = values.astype(np.uint64) & np.uint64(0xFFFF)
+		for shift, mask in ((8, 0x00FF00FF), (4, 0x0F0F0F0F), (2, 0x33333333), (1, 0x55555555)):
+			values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+		codes.append(values)
+	return codes[0] | (codes[1] << np.uint64(1))
+
+# Offsets from a grid cell to itself and the neighbouring cells after it, so every pair of neighbouring cells is visited once
+WELD_CELL_OFFSETS = [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1) if (x, y, z) >= (0, 0, 0)]
+
+# Rounds of settling welded vertices in bulk, before the few left in long chains of nearby vertices are settled one at a time
+WELD_ROUNDS = 8
+
+# Vertex each vertex is welded to, merging every vertex into the first kept vertex within the distance (as merging by distance does in Blender)
+# Candidate pairs come from the neighbouring cells of a hashed grid the size of the distance and are tested against the actual distance, then kept vertices are settled in rounds from the lowest index up
+def get_weld_targets(co, distance):
+	co = co.astype(np.float64)
+	cells = np.floor(co / distance).astype(np.int64)
+	
+	# Rank the cells along each axis so neighbouring cells stay one rank apart, then key them by column and rank (which fits in an integer at any scale)
+	ranks = [np.searchsorted(np.unique(np.concatenate((axis_cells - 1, axis_cells, axis_cells + 1))), axis_cells) for axis_cells in cells.T]
+	sizes = [int(axis_ranks.max()) + 2 for axis_ranks in ranks]
+	columns, vertex_columns = np.unique(ranks[0] * sizes[1] + ranks[1], return_inverse=True)
+	keys, cell_first, vertex_cells = np.unique(vertex_columns.ravel() * sizes[2] + ranks[2], return_index=True, return_inverse=True)
+	vertex_cells = vertex_cells.ravel()
+	cell_vertices = np.argsort(vertex_cells, kind='stable')
+	cell_total = np.bincount(vertex_cells, minlength=len(keys))
+	cell_start = np.cumsum(cell_total) - cell_total
+	cell_ranks = [axis_ranks[cell_first] for axis_ranks in ranks]
+	
+	# Pair every vertex with the vertices in its own cell and the following neighbour cells, keeping the pairs within the distance
+	# Cells are visited in key order, so every lookup searches sorted keys with sorted keys
+	first, second = [], []
+	for offset in WELD_CELL_OFFSETS:
+		shifted = (cell_ranks[0] + offset[0]) * sizes[1] + cell_ranks[1] + offset[1]
+		column = np.minimum(np.searchsorted(columns, shifted), len(columns) - 1)
+		found = columns[column] == shifted
+		shifted = column * sizes[2] + cell_ranks[2] + offset[2]
+		neighbours = np.minimum(np.searchsorted(keys, shifted), len(keys) - 1)
+		neighbours = np.where(found & (keys[neighbours] == shifted), neighbours, -1)[vertex_cells]
+		owners = np.flatnonzero(neighbours >= 0)
+		counts = cell_total[neighbours[owners]]
+		partners = cell_vertices[get_face_loops(cell_start[neighbours[owners]], counts)[0]]
+		owners = np.repeat(owners, counts)
+		if offset == (0, 0, 0):
+			ordered = owners < partners
+			owners, partners = owners[ordered], partners[ordered]
+		close = ((co[owners] - co[partners]) ** 2).sum(axis=1) <= distance * distance
+		first.append(np.minimum(owners[close], partners[close]))
+		second.append(np.maximum(owners[close], partners[close]))
+	first = np.concatenate(first)
+	second = np.concatenate(second)
+	
+	# A vertex is welded to the first kept vertex within the distance once no earlier vertex within the distance is still pending, and kept when there is none
+	targets = np.full(len(co), -1, dtype=np.int64)
+	for weld_round in range(WELD_ROUNDS):
+		open_pairs = targets[second] < 0
+		first, second = first[open_pairs], second[open_pairs]
+		kept_pairs = targets[first] == first
+		pending_pairs = targets[first] < 0
+		welded = np.full(len(co), len(co), dtype=np.int64)
+		np.minimum.at(welded, second[kept_pairs], first[kept_pairs])
+		waiting = np.full(len(co), len(co), dtype=np.int64)
+		np.minimum.at(waiting, second[pending_pairs], first[pending_pairs])
+		pending = targets < 0
+		targets = np.where(pending & (welded < waiting), welded, np.where(pending & (waiting == len(co)), np.arange(len(co)), targets))
+		if (targets >= 0).all():
+			return targets
+	
+	# Settle the vertices left in long chains one at a time in index order, when all earlier vertices are settled
+	pending = np.flatnonzero(targets < 0)
+	order = np.argsort(second, kind='stable')
+	starts = np.searchsorted(second[order], pending, side='left').tolist()
+	ends = np.searchsorted(second[order], pending, side='right').tolist()
+	earlier = first[order].tolist()
+	targets = targets.tolist()
+	for vertex, start, end in zip(pending.tolist(), starts, ends):
+		kept = [other for other in earlier[start:end] if targets[other] == other]
+		targets[vertex] = min(kept) if kept else vertex
+	return np.array(targets, dtype=np.int64)
+
+# Weld coincident vertices of a tile, drop the polygons that collapse, and reorder polygons and vertices for vertex cache locality
+# Vertices within the distance of each other are welded into the first of them, polygons are sorted along a Z-order curve of their centres, and vertices are numbered in the order they are first used
+# Takes compact tile arrays and returns the kept polygons and corners (in their new order), the kept vertices, and the remapped loop vertex and loop total arrays
+def optimize_tile_arrays(co, loop_vertex, loop_total, distance):
+	loop_start = np.cumsum(loop_total) - loop_total
+	if distance > 0.0 and len(co):
+		representatives, vertex_cells = np.unique(get_weld_targets(co, distance), return_inverse=True)
+	else:
+		representatives, vertex_cells = np.unique(co, axis=0, return_index=True, return_inverse=True)[1:]
+	corner_cells = vertex_cells.ravel()[loop_vertex]
+	
+	# Corners welded to the next corner of their polygon are removed, and polygons left with fewer than three corners are dropped
+	keep_corners = corner_cells != corner_cells[get_next_loops(loop_start, loop_total)]
+	kept_total = np.add.reduceat(keep_corners.astype(np.int64), loop_start)
+	keep_faces = kept_total >= 3
+	keep_corners &= np.repeat(keep_faces, loop_total)
+	faces = np.flatnonzero(keep_faces)
+	kept_corners = np.flatnonzero(keep_corners)
+	kept_total = kept_total[faces]
+	kept_start = np.cumsum(kept_total) - kept_total
+	if len(faces) == 0:
+		return {"faces": faces, "corners": kept_corners, "vertices": faces, "loop_vertex": np.zeros(0, dtype=np.int32), "loop_total": np.zeros(0, dtype=np.int32)}
+	
+	# Sort polygons along a Z-order curve of their centres, so neighbouring polygons (which share vertices) are drawn close together
+	corner_positions = co[representatives[corner_cells[kept_corners]]].astype(np.float64)
+	centers = np.add.reduceat(corner_positions, kept_start, axis=0)[:, :2] / kept_total[:, np.newaxis]
+	low = centers.min(axis=0)
+	scale = 65535.0 / np.maximum(centers.max(axis=0) - low, 1e-12)
+	quantized = ((centers - low) * scale).astype(np.int64)
+	order = np.argsort(get_morton_codes(quantized[:, 0], quantized[:, 1]), kind='stable')
+	corners = kept_corners[get_face_loops(kept_start[order], kept_total[order])[0]]
+	
+	# Number the welded vertices in the order they are first used
+	used_cells, first_use = np.unique(corner_cells[corners], return_index=True)
+	used_cells = used_cells[np.argsort(first_use)]
+	cell_vertices = np.empty(len(representatives), dtype=np.int64)
+	cell_vertices[used_cells] = np.arange(len(used_cells))
+	return {
+		"faces": faces[order],
+		"corners": corners,
+		"vertices": representatives[used_cells],
+		"loop_vertex": cell_vertices[corner_cells[corners]].astype(np.int32),
+		"loop_total": kept_total[order].astype(np.int32),
+		}
+
+# Weld and reorder tile geometry sliced from source arrays, keeping its polygon, loop, and vertex indices into the source
+def optimize_tile_geometry(arrays, geometry, distance):
+	optimized = optimize_tile_arrays(arrays["co"][geometry["vertices"]], geometry["loop_vertex"], geometry["loop_total"], distance)
+	return {
+		"faces": geometry["faces"][optimized["faces"]],
+		"loops": geometry["loops"][optimized["corners"]],
+		"vertices": geometry["vertices"][optimized["vertices"]],
+		"loop_start": (np.cumsum(optimized["loop_total"]) - optimized["loop_total"]).astype(np.int32),
+		"loop_total": optimized["loop_total"],
+		"loop_vertex": optimized["loop_vertex"],
+		}
+
+# Size of a shared vertex (position, normal and UV) and of an index in a GPU mesh, used to report the savings of welded tiles
+VERTEX_BYTES = 32
+INDEX_BYTES = 4
+
+# Bytes saved by welding and compacting a tile, from its vertex and corner counts before and after
+def get_weld_savings(vertices, corners, welded_vertices, welded_corners):
+	return (vertices - welded_vertices) * VERTEX_BYTES + (corners - welded_corners) * INDEX_BYTES
+
+# Match tile edges back to the source edge indices using their sorted vertex pairs (-1 for edges the source doesn't have, such as edges between welded vertices)
+def get_source_edges(arrays, edge_vertices):
+	edge_vertices = np.sort(edge_vertices.astype(np.int64), axis=1)
+	keys = edge_vertices[:, 0] * len(arrays["co"]) + edge_vertices[:, 1]
+	positions = np.clip(np.searchsorted(arrays["edge_keys"], keys), 0, len(arrays["edge_keys"]) - 1)
+	return np.where(arrays["edge_keys"][positions] == keys, arrays["edge_order"][positions], -1)
+
+# Fill an empty mesh with vertices and polygons from flat arrays, then build the edges from the polygons
+def set_mesh_geometry(mesh_data, co, loop_vertex, loop_start, loop_total):
+	mesh_data.vertices.add(len(co))
+	mesh_data.vertices.foreach_set("co", np.ascontiguousarray(co, dtype=np.float32).ravel())
+	mesh_data.loops.add(len(loop_vertex))
+	mesh_data.loops.foreach_set("vertex_index", np.ascontiguousarray(loop_vertex, dtype=np.int32))
+	mesh_data.polygons.add(len(loop_start))
+	mesh_data.polygons.foreach_set("loop_start", np.ascontiguousarray(loop_start, dtype=np.int32))
+	if bpy.app.version < (4, 0, 0):
+		mesh_data.polygons.foreach_set("loop_total", np.ascontiguousarray(loop_total, dtype=np.int32))
+	mesh_data.update(calc_edges=True)
+
+# Create a new mesh data block for a single tile directly from the source arrays, with vertex positions relative to the tile origin
+def build_tile_mesh(name, arrays, geometry, origin=(0.0, 0.0, 0.0)):
+	tile_mesh = bpy.data.meshes.new(name)
+	
+	# Geometry
+	set_mesh_geometry(tile_mesh, arrays["co"][geometry["vertices"]] - np.asarray(origin, dtype=np.float64), geometry["loop_vertex"], geometry["loop_start"], geometry["loop_total"])
+	tile_mesh.polygons.foreach_set("material_index", arrays["material_index"][geometry["faces"]])
+	tile_mesh.polygons.foreach_set("use_smooth", arrays["use_smooth"][geometry["faces"]])
+	
+	# Materials
+	for material in arrays["materials"]:
+		tile_mesh.materials.append(material)
+	
+	# Edges are rebuilt from the polygons, so map them back to the source edges for edge data
+	source_edges = get_source_edges(arrays, geometry["vertices"][foreach_get_array(tile_mesh.edges, "vertices", 2, np.int32)])
+	new_edges = source_edges < 0
+	tile_mesh.edges.foreach_set("use_seam", arrays["use_seam"][source_edges] & ~new_edges)
+	
+	# UV maps
+	for uv_name, uv_render, uv_values in arrays["uv_layers"]:
+		uv_layer = tile_mesh.uv_layers.new(name=uv_name, do_init=False)
+		uv_layer.data.foreach_set("uv", uv_values[geometry["loops"]].ravel())
+		uv_layer.active_render = uv_render
+	if arrays["uv_layers"]:
+		tile_mesh.uv_layers.active_index = arrays["uv_active"]
+	
+	# Generic attributes
+	domain_indices = {'POINT': geometry["vertices"], 'EDGE': source_edges, 'FACE': geometry["faces"], 'CORNER': geometry["loops"]}
+	for attribute_name, domain, data_type, values in arrays["attributes"]:
+		attribute = tile_mesh.attributes.get(attribute_name)
+		if attribute is None:
+			attribute = tile_mesh.attributes.new(attribute_name, data_type, domain)
+		elif attribute.domain != domain or attribute.data_type != data_type:
+			continue
+		values = values[domain_indices[domain]]
+		if domain == 'EDGE':
+			values[new_edges] = 0
+		attribute.data.foreach_set(ATTRIBUTE_TYPES[data_type][0], values.ravel())
+	
+	# Custom split normals
+	if arrays["normals"] is not None:
+		if hasattr(tile_mesh, "use_auto_smooth"):
+			tile_mesh.use_auto_smooth = True
+		tile_mesh.normals_split_custom_set(arrays["normals"][geometry["loops"]])
+	
+	return tile_mesh
+
+# Create a tile object that duplicates the source object settings (modifiers, material slots, visibility) with new tile mesh data, placed at the tile origin
+# Tiles are linked to the same collections as the source, unless a specific collection is given
+def build_tile_object(source_object, name, arrays, geometry, origin=(0.0, 0.0, 0.0), collection=None):
+	tile_object = source_object.copy()
+	tile_object.data = build_tile_mesh(name, arrays, geometry, origin)
+	tile_object.name = name
+	tile_object.matrix_world = Matrix.Translation(origin)
+	for target in ([collection] if collection else source_object.users_collection):
+		target.objects.link(tile_object)
+	
+	# Vertex group weights
+	set_vertex_weights(tile_object, arrays, geometry["vertices"])
+	
+	return tile_object
+
+# Add the vertex group weights of the given source vertices to an object, whose mesh holds those vertices in the same order
+def set_vertex_weights(target_object, arrays, vertices):
+	if arrays["weights"] is None:
+		return
+	weight_vertices, weight_groups, weight_values = arrays["weights"]
+	
+	# Map source vertex indices to tile vertex indices (-1 for vertices not in this tile)
+	vertex_map = np.full(len(arrays["co"]), -1, dtype=np.int64)
+	vertex_map[vertices] = np.arange(len(vertices))
+	tile_vertices = vertex_map[weight_vertices]
+	inside = tile_vertices >= 0
+	
+	for group_index, group_name in enumerate(arrays["vertex_groups"]):
+		vertex_group = target_object.vertex_groups.get(group_name) or target_object.vertex_groups.new(name=group_name)
+		selection = inside & (weight_groups == group_index)
+		if not np.any(selection):
+			continue
+		
+		# Vertex groups only accept a single weight per call, so batch vertices that share the same weight
+		group_vertices = tile_vertices[selection]
+		group_weights = weight_values[selection]
+		order = np.argsort(group_weights, kind='stable')
+		unique_weights, starts = np.unique(group_weights[order], return_index=True)
+		for weight, batch in zip(unique_weights, np.split(group_vertices[order], starts[1:])):
+			vertex_group.add(batch.tolist(), float(weight), 'REPLACE')
+
+# Replace the mesh of an object with the given polygons of mesh arrays, keeping its mesh name and vertex group weights
+def replace_mesh_faces(mesh_object, arrays, faces):
+	old_mesh = mesh_object.data
+	mesh_name = old_mesh.name
+	geometry = get_tile_geometry(arrays, faces)
+	mesh_object.data = build_tile_mesh(mesh_name, arrays, geometry)
+	if old_mesh.users == 0:
+		bpy.data.meshes.remove(old_mesh)
+	mesh_object.data.name = mesh_name
+	set_vertex_weights(mesh_object, arrays, geometry["vertices"])
+
+# Delete the given polygons (and any vertices or edges left unused) from a mesh in a single edit
+def remove_mesh_faces(mesh_data, face_mask):
+	if not np.any(face_mask):
+		return
+	bm = bmesh.new()
+	bm.from_mesh(mesh_data)
+	bm.faces.ensure_lookup_table()
+	bmesh.ops.delete(bm, geom=[bm.faces[index] for index in np.flatnonzero(face_mask)], context='FACES')
+	bm.to_mesh(mesh_data)
+	bm.free()
+	mesh_data.update()
+
+
+
+###########################################################################
+# Polygon clipping
+
+# Distance from a tile boundary (relative to the tile size) within which vertices are treated as lying on it, so no sliver polygons are cut off
+CLIP_TOLERANCE = 1e-6
+
+# Index of the next loop within each polygon, wrapping the last loop back to the first
+def get_next_loops(loop_start, loop_total):
+	next_loops = np.arange(1, int(loop_total.sum()) + 1)
+	next_loops[loop_start + loop_total - 1] = loop_start
+	return next_loops
+
+# Arrays interpolated at cut points, per corner (UV maps, corner attributes, and custom normals) and per vertex (point attributes)
+def get_clip_templates(arrays):
+	corner_templates = [uv_values for uv_name, uv_render, uv_values in arrays["uv_layers"]]
+	corner_templates += [values for name, domain, data_type, values in arrays["attributes"] if domain == 'CORNER']
+	if arrays["normals"] is not None:
+		corner_templates.append(arrays["normals"])
+	vertex_templates = [values for name, domain, data_type, values in arrays["attributes"] if domain == 'POINT']
+	return corner_templates, vertex_templates
+
+# Pack arrays into one float matrix, so cut points interpolate every value in one operation
+def pack_clip_values(templates, size):
+	if not templates:
+		return np.zeros((size, 0))
+	return np.hstack([values.astype(np.float64).reshape(size, -1) for values in templates])
 
+# Split packed columns back into arrays with the shape and type of each template, in packing order
+def unpack_clip_values(packed, templates):
+	column = 0
+	for template in templates:
+		width = template.shape[1] if template.ndim > 1 else 1
+		values = packed[:, column:column + width].reshape((len(packed),) + template.shape[1:])
+		column += width
+		if template.dtype == bool:
+			values = values > 0.5
+		elif np.issubdtype(template.dtype, np.integer):
+			values = np.rint(values)
+		yield values.astype(template.dtype)
 
+# Select polygons (with all of their corners) from a polygon soup
+def select_soup_faces(soup, face_mask):
+	corner_mask = np.repeat(face_mask, soup["total"])
+	return {key: values[face_mask] if key in ("faces", "total") else values[corner_mask] for key, values in soup.items()}
+
+# Interleave two per-corner arrays, so every corner is followed by its cut point
+def interleave_corners(values, cut_values):
+	return np.stack((values, cut_values), axis=1).reshape((2 * len(values),) + values.shape[1:])
+
+# Cut every polygon of a soup along its own line (perpendicular to the axis), returning the soups on either side and the cut points
+# Each side keeps its corners on that side plus the points where edges cross the line (Sutherland-Hodgman, evaluated for all polygons at once)
+def split_soup_faces(soup, axis, line_values, line_ids, line_count, vertex_total, tolerance):
+	total = soup["total"]
+	starts = np.cumsum(total) - total
+	corner_faces = np.repeat(np.arange(len(total)), total)
+	next_corners = get_next_loops(starts, total)
+	distance = soup["points"][:, axis] - line_values[corner_faces]
+	distance[np.abs(distance) < tolerance] = 0.0
+	next_distance = distance[next_corners]
+	crossing = ((distance < 0.0) & (next_distance > 0.0)) | ((distance > 0.0) & (next_distance < 0.0))
+	
+	# Cut points, interpolated along each crossing edge and placed exactly on the line
+	cross = np.flatnonzero(crossing)
+	factor = (distance[cross] / (distance[cross] - next_distance[cross]))[:, np.newaxis]
+	cut_points = soup["points"].copy()
+	cut_points[cross] += (soup["points"][next_corners[cross]] - soup["points"][cross]) * factor
+	cut_points[cross, axis] = line_values[corner_faces[cross]]
+	cut_values = soup["values"].copy()
+	cut_values[cross] += (soup["values"][next_corners[cross]] - soup["values"][cross]) * factor
+	cut_vertices = np.full(len(distance), -1, dtype=np.int64)
+	cut_vertices[cross] = vertex_total + np.arange(len(cross))
+	cuts = {
+		"edges": soup["vertices"][np.stack((cross, next_corners[cross]), axis=1)],
+		"factor": factor,
+		"points": cut_points[cross],
+		# Cut points are identified by the source edge they lie on and the line, so neighbouring polygons share them
+		"keys": np.stack((soup["edges"][cross], line_ids[corner_faces[cross]]), axis=1),
+		}
+	
+	# Edges running along the cut are coded by their source polygon and line, so points later cut on them are shared by both sides
+	cut_codes = -1 - (soup["faces"][corner_faces] * line_count + line_ids[corner_faces])
+	
+	# Corners at or below the line (negative distances) form the first side, corners at or above it the second
+	sides = []
+	for sign in (1.0, -1.0):
+		inside = distance * sign <= 0.0
+		leaving = next_distance * sign > 0.0
+		
+		# Each corner emits itself when inside, followed by a cut point when its edge crosses the line
+		# The edge after a corner runs along the cut when the next corner emitted is a cut point (or a corner on the line) further around the polygon
+		emit = interleave_corners(inside, crossing)
+		edges = interleave_corners(np.where((distance == 0.0) & leaving, cut_codes, soup["edges"]), np.where(leaving, cut_codes, soup["edges"]))
+		side_total = np.add.reduceat(inside.astype(np.int64) + crossing, starts)
+		side = {
+			"faces": soup["faces"],
+			"total": side_total,
+			"vertices": interleave_corners(soup["vertices"], cut_vertices)[emit],
+			"edges": edges[emit],
+			"points": interleave_corners(soup["points"], cut_points)[emit],
+			"values": interleave_corners(soup["values"], cut_values)[emit],
+			}
+		
+		# Polygons that only touch the line leave fewer than three corners on one side
+		sides.append(select_soup_faces(side, side_total >= 3))
+	return sides[0], sides[1], cuts
+
+# Clip a polygon soup against every grid line along one axis, cutting each polygon at its lowest crossed line per batch until every piece lies between two lines
+# Cut points on the same edge and line are merged afterwards, so polygons sharing an edge stay connected
+def clip_soup_axis(soup, vertex_values, weights, group_count, axis, start, size, count, bounds, line_base, line_count):
+	tolerance = CLIP_TOLERANCE * size
+	
+	# Extending edge tiles only cuts between tiles, otherwise polygons are also cut along the outer boundary of the grid
+	first_line, last_line = (1, count - 1) if bounds else (0, count)
+	vertex_base = vertex_total = len(vertex_values)
+	finished = []
+	cut_points = []
+	cut_keys = []
+	while len(soup["faces"]):
+		starts = np.cumsum(soup["total"]) - soup["total"]
+		coordinates = (soup["points"][:, axis] - start) / size
+		low = np.clip(np.floor(np.minimum.reduceat(coordinates, starts) + CLIP_TOLERANCE).astype(np.int64), first_line - 1, last_line)
+		high = np.clip(np.ceil(np.maximum.reduceat(coordinates, starts) - CLIP_TOLERANCE).astype(np.int64) - 1, first_line - 1, last_line)
+		split = high > low
+		finished.append(select_soup_faces(soup, ~split))
+		if not np.any(split):
+			break
+		soup = select_soup_faces(soup, split)
+		lines = low[split] + 1
+		below, soup, cuts = split_soup_faces(soup, axis, start + lines * size, line_base + lines, line_count, vertex_total, tolerance)
+		finished.append(below)
+		
+		# Interpolate vertex values for the new cut points (endpoints may be cut points from earlier batches)
+		edge_values = vertex_values[cuts["edges"]]
+		vertex_values = np.concatenate((vertex_values, edge_values[:, 0] + (edge_values[:, 1] - edge_values[:, 0]) * cuts["factor"]))
+		if weights is not None:
+			weights = interpolate_vertex_weights(weights, cuts["edges"], cuts["factor"], vertex_total, group_count)
+		vertex_total += len(cuts["points"])
+		cut_points.append(cuts["points"])
+		cut_keys.append(cuts["keys"])
+	soup = {key: np.concatenate([part[key] for part in finished]) for key in finished[0]}
+	if not cut_points:
+		return soup, np.zeros((0, 3)), vertex_values, weights
+	
+	# Merge cut points with the same key, keeping the first of each
+	keys, first, inverse = np.unique(np.concatenate(cut_keys), axis=0, return_index=True, return_inverse=True)
+	remap = np.concatenate((np.arange(vertex_base), vertex_base + inverse.ravel()))
+	soup["vertices"] = remap[soup["vertices"]]
+	if weights is not None:
+		kept = np.full(vertex_total, -1, dtype=np.int64)
+		kept[:vertex_base] = np.arange(vertex_base)
+		kept[vertex_base + first] = vertex_base + np.arange(len(first))
+		weight_mask = kept[weights[0]] >= 0
+		weights = sort_vertex_weights((kept[weights[0][weight_mask]], weights[1][weight_mask], weights[2][weight_mask]))
+	return soup, np.concatenate(cut_points)[first], np.concatenate((vertex_values[:vertex_base], vertex_values[vertex_base + first])), weights
+
+# Add sparse weights for new vertices numbered from first_vertex, interpolated along each edge by its factor (only groups present at either end get a weight)
+def interpolate_vertex_weights(weights, edges, factor, first_vertex, group_count):
+	ends, entries = get_vertex_weight_entries(weights, edges.ravel())
+	cuts = ends // 2
+	scale = np.where(ends % 2 == 0, 1.0 - factor.ravel()[cuts], factor.ravel()[cuts])
+	added = sum_element_weights(first_vertex + cuts, weights[1][entries], weights[2][entries] * scale, group_count)
+	return tuple(np.concatenate(values) for values in zip(weights, added))
+
+# Cut polygons along the boundaries of the tile grid, returning new mesh arrays where every polygon lies within a single tile
+# Every polygon crossing a grid line is cut in the same batch, so the number of batches only depends on how many tiles the largest polygon spans
+# UVs, attributes, custom normals, and vertex group weights are interpolated at the cut points (concave polygons may leave zero-width bridges along a cut)
+def clip_mesh_arrays(arrays, start, size, count, bounds):
+	corner_templates, vertex_templates = get_clip_templates(arrays)
+	loop_vertex = arrays["loop_vertex"].astype(np.int64)
+	next_loops = get_next_loops(arrays["loop_start"], arrays["loop_total"])
+	co = arrays["co"].astype(np.float64)
+	soup = {
+		"faces": np.arange(len(arrays["loop_total"])),
+		"total": arrays["loop_total"].astype(np.int64),
+		"vertices": loop_vertex,
+		# Source edge from each corner to the next (edges along cuts get negative codes)
+		"edges": get_source_edges(arrays, np.stack((loop_vertex, loop_vertex[next_loops]), axis=1)).astype(np.int64),
+		"points": co[loop_vertex],
+		"values": pack_clip_values(corner_templates, len(loop_vertex)),
+		}
+	vertex_values = pack_clip_values(vertex_templates, len(co))
+	
+	# Vertex group weights stay sparse, so memory doesn't grow with the number of groups
+	weights = None
+	if arrays["weights"] is not None:
+		weights = sort_vertex_weights((arrays["weights"][0].astype(np.int64), arrays["weights"][1].astype(np.int64), arrays["weights"][2].astype(np.float64)))
+	line_count = count[0] + count[1] + 2
+	for axis, line_base in ((0, 0), (1, count[0] + 1)):
+		soup, cut_points, vertex_values, weights = clip_soup_axis(soup, vertex_values, weights, len(arrays["vertex_groups"]), axis, start[axis], size[axis], count[axis], bounds, line_base, line_count)
+		co = np.concatenate((co, cut_points))
+	return get_clipped_arrays(arrays, soup, co, vertex_values, weights, corner_templates, vertex_templates)
+
+# Build mesh arrays from a clipped polygon soup, taking polygon data from the source polygon of each piece
+def get_clipped_arrays(arrays, soup, co, vertex_values, weights, corner_templates, vertex_templates):
+	faces = soup["faces"]
+	loop_start = np.cumsum(soup["total"]) - soup["total"]
+	clipped = {
+		"co": co.astype(np.float32),
+		"loop_vertex": soup["vertices"].astype(np.int32),
+		"loop_start": loop_start.astype(np.int32),
+		"loop_total": soup["total"].astype(np.int32),
+		"material_index": arrays["material_index"][faces],
+		"use_smooth": arrays["use_smooth"][faces],
+		"materials": arrays["materials"],
+		"attributes": [],
+		"uv_layers": [],
+		"uv_active": arrays["uv_active"],
+		"normals": None,
+		"vertex_groups": arrays["vertex_groups"],
+		"weights": None,
+		}
+	
+	# Edges are rebuilt from the polygons, taking seams and edge attributes from the source edge each one is part of (edges along cuts have none)
+	loop_vertex = soup["vertices"]
+	edge_vertices = np.sort(np.stack((loop_vertex, loop_vertex[get_next_loops(loop_start, soup["total"])]), axis=1), axis=1)
+	edge_keys, inverse = np.unique(edge_vertices[:, 0] * len(co) + edge_vertices[:, 1], return_inverse=True)
+	source_edges = np.full(len(edge_keys), -1, dtype=np.int64)
+	np.maximum.at(source_edges, inverse.ravel(), soup["edges"])
+	cut_edges = source_edges < 0
+	source_edges[cut_edges] = 0
+	clipped["edge_vertices"] = np.stack((edge_keys // len(co), edge_keys % len(co)), axis=1)
+	clipped["edge_order"] = np.arange(len(edge_keys))
+	clipped["edge_keys"] = edge_keys
+	clipped["use_seam"] = arrays["use_seam"][source_edges] & ~cut_edges
+	
+	# Interpolated values, unpacked in the order they were packed
+	corner_values = unpack_clip_values(soup["values"], corner_templates)
+	vertex_values = unpack_clip_values(vertex_values, vertex_templates)
+	for uv_name, uv_render, uv_values in arrays["uv_layers"]:
+		clipped["uv_layers"].append((uv_name, uv_render, next(corner_values)))
+	for name, domain, data_type, values in arrays["attributes"]:
+		if domain == 'CORNER':
+			values = next(corner_values)
+		elif domain == 'POINT':
+			values = next(vertex_values)
+		elif domain == 'FACE':
+			values = values[faces]
+		else:
+			values = values[source_edges]
+			values[cut_edges] = 0
+		clipped["attributes"].append((name, domain, data_type, values))
+	if arrays["normals"] is not None:
+		normals = next(corner_values)
+		clipped["normals"] = normals / np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+	if weights is not None:
+		positive = weights[2] > 0.0
+		clipped["weights"] = (weights[0][positive], weights[1][positive], weights[2][positive].astype(np.float32))
+	return clipped
+
+
+
+###########################################################################
+# Tile file output
+
+# Human readable byte count for reports
+def format_bytes(byte_count):
+	if byte_count is None:
+		return "unknown"
+	for unit in ("B", "KB", "MB", "GB"):
+		if abs(byte_count) < 1024.0 or unit == "GB":
+			return "{:.1f}".format(byte_count) + unit
+		byte_count /= 1024.0
+
+# Peak resident memory of the current process in bytes (None where the platform doesn't provide it)
+def get_peak_process_memory():
+	if resource is None:
+		return None
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return peak if sys.platform == "darwin" else peak * 1024
+
+# Origin point of a set of polygons for each tile origin mode, matching the results of the equivalent origin_set operators
+def get_geometry_origin(origin, co, loop_vertex, loop_start, loop_total, tile_center):
+	if origin == "TILE":
+		return np.array(tile_center, dtype=np.float64)
+	if origin == "ZERO" or len(co) == 0:
+		return np.zeros(3, dtype=np.float64)
+	co = co.astype(np.float64)
+	if origin == "BOX":
+		return (co.min(axis=0) + co.max(axis=0)) * 0.5
+	if origin == "MEDIAN":
+		return co.mean(axis=0)
+	
+	# Surface centre: fan triangle centroids weighted by their area, signed against the normal of each polygon so the fans of concave polygons cancel out correctly
+	triangles = loop_vertex[get_fan_triangles(loop_start, loop_total)]
+	triangle_faces = np.repeat(np.arange(len(loop_total)), np.maximum(loop_total - 2, 0))
+	crosses = np.cross(co[triangles[:, 1]] - co[triangles[:, 0]], co[triangles[:, 2]] - co[triangles[:, 0]])
+	normals = np.column_stack([np.bincount(triangle_faces, weights=crosses[:, axis], minlength=len(loop_total)) for axis in range(3)])
+	normals /= np.maximum(np.linalg.norm(normals, axis=1), 1e-30)[:, np.newaxis]
+	areas = np.einsum("ij,ij->i", crosses, normals[triangle_faces]) * 0.5
+	if areas.sum() > 0.0:
+		surface_center = (co[triangles].mean(axis=1) * areas[:, np.newaxis]).sum(axis=0) / areas.sum()
+	else:
+		surface_center = co.mean(axis=0)
+	if origin == "MASS":
+		return surface_center
+	
+	# Volume centre: signed tetrahedra between a reference point and each fan triangle (falls back to the surface centre for open or flat geometry)
+	reference = co.mean(axis=0)
+	a = co[triangles[:, 0]] - reference
+	b = co[triangles[:, 1]] - reference
+	c = co[triangles[:, 2]] - reference
+	volumes = np.einsum("ij,ij->i", a, np.cross(b, c)) / 6.0
+	if abs(volumes.sum()) <= np.finfo(np.float32).eps:
+		return surface_center
+	return reference + ((a + b + c) * 0.25 * volumes[:, np.newaxis]).sum(axis=0) / volumes.sum()
+
+# Loop indices of every triangle when each polygon is split into a fan from its first corner
+def get_fan_triangles(loop_start, loop_total):
+	triangle_counts = np.maximum(loop_total - 2, 0)
+	triangle_first = np.repeat(loop_start, triangle_counts)
+	triangle_offsets = np.arange(int(triangle_counts.sum())) - np.repeat(np.cumsum(triangle_counts) - triangle_counts, triangle_counts) + 1
+	return np.column_stack((triangle_first, triangle_first + triangle_offsets, triangle_first + triangle_offsets + 1))
+
+# Split vertices wherever a vertex has more than one set of corner values (such as UVs and normals), since PLY and glTF store them per vertex
+# Returns the split vertex positions and values, and the loop vertex indices remapped to them
+def get_split_vertices(co, loop_vertex, values):
+	keys = np.column_stack((loop_vertex.astype(np.int64), np.ascontiguousarray(values, dtype=np.float32).view(np.int32).astype(np.int64)))
+	corner_keys, loop_vertex = np.unique(keys, axis=0, return_inverse=True)
+	return co[corner_keys[:, 0]], np.ascontiguousarray(corner_keys[:, 1:].astype(np.int32)).view(np.float32), loop_vertex.ravel()
+
+# Normal of every corner as Blender shades it: custom normals when given, otherwise the vertex normal for smooth polygons and the polygon normal for flat ones
+# Vertex normals are averaged from the area weighted normals of the given polygons, so they can differ slightly from the source mesh along tile edges
+def get_corner_normals(co, loop_vertex, loop_total, use_smooth, normals=None):
+	if normals is None:
+		corner_co = co[loop_vertex]
+		triangles = get_fan_triangles(np.cumsum(loop_total) - loop_total, loop_total)
+		triangle_faces = np.repeat(np.arange(len(loop_total)), np.maximum(loop_total - 2, 0))
+		crosses = np.cross(corner_co[triangles[:, 1]] - corner_co[triangles[:, 0]], corner_co[triangles[:, 2]] - corner_co[triangles[:, 0]])
+		face_normals = np.column_stack([np.bincount(triangle_faces, weights=crosses[:, axis], minlength=len(loop_total)) for axis in range(3)])
+		corner_faces = np.repeat(np.arange(len(loop_total)), loop_total)
+		vertex_normals = np.column_stack([np.bincount(loop_vertex, weights=face_normals[corner_faces, axis], minlength=len(co)) for axis in range(3)])
+		normals = np.where(use_smooth[corner_faces][:, np.newaxis], vertex_normals[loop_vertex], face_normals[corner_faces])
+	
+	# Degenerate polygons have no direction, so they face up rather than writing zero length normals
+	lengths = np.linalg.norm(normals, axis=1)
+	normals = np.where((lengths > 1e-12)[:, np.newaxis], normals / np.maximum(lengths, 1e-12)[:, np.newaxis], (0.0, 0.0, 1.0))
+	return normals
+
+# Write polygons to a binary little endian PLY file (with per-vertex texture coordinates when UVs are provided)
+def write_ply(filepath, co, loop_vertex, loop_total, uvs=None):
+	if uvs is not None:
+		co, vertex_uvs, loop_vertex = get_split_vertices(co, loop_vertex, uvs)
+		vertex_data = np.column_stack((co, vertex_uvs)).astype("<f4")
+	else:
+		vertex_data = co.astype("<f4")
+	
+	# Polygon records are a vertex count followed by the vertex indices
+	count_type = "uchar" if len(loop_total) == 0 or loop_total.max() < 256 else "uint"
+	loop_start = np.cumsum(loop_total) - loop_total
+	if count_type == "uchar":
+		face_data = np.insert(loop_vertex.astype("<i4").view(np.uint8), loop_start * 4, loop_total.astype(np.uint8))
+	else:
+		face_data = np.insert(loop_vertex.astype("<i4"), loop_start, loop_total.astype("<i4"))
+	
+	header = [
+		"ply",
+		"format binary_little_endian 1.0",
+		"comment VF Segment Mesh",
+		"element vertex " + str(len(vertex_data)),
+		"property float x",
+		"property float y",
+		"property float z"]
+	if uvs is not None:
+		header += ["property float s", "property float t"]
+	header += [
+		"element face " + str(len(loop_total)),
+		"property list " + count_type + " int vertex_indices",
+		"end_header"]
+	with open(filepath, "wb") as file:
+		file.write(("\n".join(header) + "\n").encode("ascii"))
+		file.write(vertex_data.tobytes())
+		file.write(face_data.tobytes())
+
+# glTF accessor component types and buffer view targets
+GLTF_FLOAT = 5126
+GLTF_UNSIGNED_INT = 5125
+GLTF_ARRAY_BUFFER = 34962
+GLTF_ELEMENT_ARRAY_BUFFER = 34963
+
+# Convert Blender's Z up coordinates to glTF's Y up coordinates
+def get_y_up(co):
+	return np.column_stack((co[:, 0], co[:, 2], -co[:, 1]))
+
+# Write polygons to a binary glTF file as a fan triangulated mesh, in a node placed at the given translation (in Blender coordinates)
+# Corners are given normals (and UVs when provided), and triangles are split into one primitive per material index, named after the given material names
+def write_glb(filepath, co, loop_vertex, loop_total, uvs=None, name="Tile", translation=(0.0, 0.0, 0.0), normals=None, material_index=None, material_names=()):
+	corner_values = [values for values in (uvs, normals) if values is not None]
+	if corner_values:
+		co, vertex_values, loop_vertex = get_split_vertices(co, loop_vertex, np.column_stack(corner_values))
+	positions = get_y_up(co).astype("<f4")
+	
+	# Triangles are grouped by material, keeping their order within each material
+	triangles = get_fan_triangles(np.cumsum(loop_total) - loop_total, loop_total)
+	triangle_materials = np.repeat(material_index if material_index is not None else np.zeros(len(loop_total), dtype=np.int32), np.maximum(loop_total - 2, 0))
+	order = np.argsort(triangle_materials, kind='stable')
+	materials, material_start = np.unique(triangle_materials[order], return_index=True)
+	indices = loop_vertex[triangles[order]].astype("<u4")
+	
+	# Every element is 4 bytes, so the buffer views stay aligned when packed back to back
+	views = [(positions.tobytes(), GLTF_ARRAY_BUFFER), (indices.tobytes(), GLTF_ELEMENT_ARRAY_BUFFER)]
+	accessors = [{"bufferView": 0, "componentType": GLTF_FLOAT, "count": len(positions), "type": "VEC3", "min": positions.min(axis=0).tolist(), "max": positions.max(axis=0).tolist()}]
+	attributes = {"POSITION": 0}
+	if uvs is not None:
+		# glTF texture coordinates start from the top left
+		views.append((np.column_stack((vertex_values[:, 0], 1.0 - vertex_values[:, 1])).astype("<f4").tobytes(), GLTF_ARRAY_BUFFER))
+		accessors.append({"bufferView": len(views) - 1, "componentType": GLTF_FLOAT, "count": len(positions), "type": "VEC2"})
+		attributes["TEXCOORD_0"] = len(accessors) - 1
+	if normals is not None:
+		views.append((get_y_up(vertex_values[:, -3:]).astype("<f4").tobytes(), GLTF_ARRAY_BUFFER))
+		accessors.append({"bufferView": len(views) - 1, "componentType": GLTF_FLOAT, "count": len(positions), "type": "VEC3"})
+		attributes["NORMAL"] = len(accessors) - 1
+	offsets = np.cumsum([0] + [len(data) for data, target in views])
+	
+	# One primitive per material, each reading its range of the shared index buffer (slots without a material use the default material)
+	primitives = []
+	gltf_materials = []
+	for material, start, end in zip(materials.tolist(), material_start.tolist(), material_start[1:].tolist() + [len(order)]):
+		primitive = {"attributes": attributes, "indices": len(accessors)}
+		accessors.append({"bufferView": 1, "byteOffset": start * 12, "componentType": GLTF_UNSIGNED_INT, "count": (end - start) * 3, "type": "SCALAR"})
+		if 0 <= material < len(material_names) and material_names[material] is not None:
+			primitive["material"] = len(gltf_materials)
+			gltf_materials.append({"name": material_names[material]})
+		primitives.append(primitive)
+	
+	gltf = {
+		"asset": {"version": "2.0", "generator": "VF Segment Mesh"},
+		"scene": 0,
+		"scenes": [{"nodes": [0]}],
+		"nodes": [{"name": name, "mesh": 0, "translation": get_y_up(np.array([translation], dtype=np.float64))[0].tolist()}],
+		"meshes": [{"name": name, "primitives": primitives}],
+		"buffers": [{"byteLength": int(offsets[-1])}],
+		"bufferViews": [{"buffer": 0, "byteOffset": int(offsets[index]), "byteLength": len(data), "target": target} for index, (data, target) in enumerate(views)],
+		"accessors": accessors,
+		}
+	if gltf_materials:
+		gltf["materials"] = gltf_materials
+	json_chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+	json_chunk += b" " * (-len(json_chunk) % 4)
+	
+	# Header, JSON chunk and binary chunk (magic "glTF", "JSON", "BIN")
+	with open(filepath, "wb") as file:
+		file.write(struct.pack("<III", 0x46546C67, 2, 28 + len(json_chunk) + int(offsets[-1])))
+		file.write(struct.pack("<II", len(json_chunk), 0x4E4F534A))
+		file.write(json_chunk)
+		file.write(struct.pack("<II", int(offsets[-1]), 0x004E4942))
+		for data, target in views:
+			file.write(data)
+
+# Active UV map values (PLY supports a single set of texture coordinates)
+def get_active_uvs(arrays):
+	return arrays["uv_layers"][max(arrays["uv_active"], 0)][2] if arrays["uv_layers"] else None
+
+# Names of the material slots of mesh arrays (None for empty slots), read once so worker processes don't touch Blender data
+def get_material_names(arrays):
+	return [material.name if material is not None else None for material in arrays["materials"]]
+
+# Slice the polygon and loop data of a set of polygons for writing to a tile file
+def get_tile_part(arrays, faces, uv_values=None):
+	loop_total = arrays["loop_total"][faces]
+	loops, compact_start = get_face_loops(arrays["loop_start"][faces], loop_total)
+	part = {"loop_vertex": arrays["loop_vertex"][loops], "loop_total": loop_total, "material_index": arrays["material_index"][faces], "use_smooth": arrays["use_smooth"][faces]}
+	if uv_values is not None:
+		part["uv"] = uv_values[loops]
+	if arrays["normals"] is not None:
+		part["normals"] = arrays["normals"][loops]
+	return part
+
+# Combine the accumulated parts of a tile, place it relative to its origin and write it to disk in the format given by the file extension
+# Tiles are welded and reordered for vertex cache locality when a weld distance is given, and glTF tiles are split into one primitive per material
+# Returns the tile origin, the bounds of its geometry, its face, vertex, and file byte counts, and the bytes saved by welding
+def write_tile_file(filepath, arrays, parts, origin, tile_center, weld_distance=None, material_names=()):
+	loop_vertex = np.concatenate([part["loop_vertex"] for part in parts])
+	loop_total = np.concatenate([part["loop_total"] for part in parts])
+	material_index = np.concatenate([part["material_index"] for part in parts])
+	use_smooth = np.concatenate([part["use_smooth"] for part in parts])
+	uvs = np.concatenate([part["uv"] for part in parts]) if "uv" in parts[0] else None
+	normals = np.concatenate([part["normals"] for part in parts]) if "normals" in parts[0] else None
+	vertices, loop_vertex = np.unique(loop_vertex, return_inverse=True)
+	loop_vertex = loop_vertex.ravel()
+	saved_bytes = 0
+	if weld_distance is not None:
+		optimized = optimize_tile_arrays(arrays["co"][vertices], loop_vertex, loop_total, weld_distance)
+		saved_bytes = get_weld_savings(len(vertices), len(loop_vertex), len(optimized["vertices"]), len(optimized["corners"]))
+		vertices = vertices[optimized["vertices"]]
+		loop_vertex = optimized["loop_vertex"]
+		loop_total = optimized["loop_total"]
+		material_index = material_index[optimized["faces"]]
+		use_smooth = use_smooth[optimized["faces"]]
+		uvs = uvs[optimized["corners"]] if uvs is not None else None
+		normals = normals[optimized["corners"]] if normals is not None else None
+		
+		# Tiles where every polygon collapses under the weld distance aren't written
+		if len(loop_total) == 0:
+			return None
+	co = arrays["co"][vertices].astype(np.float64)
+	tile_origin = get_geometry_origin(origin, co, loop_vertex, np.cumsum(loop_total) - loop_total, loop_total, tile_center)
+	if filepath.endswith(".glb"):
+		normals = get_corner_normals(co, loop_vertex, loop_total, use_smooth, normals)
+		write_glb(filepath, co - tile_origin, loop_vertex, loop_total, uvs, os.path.splitext(os.path.basename(filepath))[0], tile_origin, normals, material_index, material_names)
+	else:
+		write_ply(filepath, co - tile_origin, loop_vertex, loop_total, uvs)
+	return {"origin": tile_origin.tolist(), "bounds": [co.min(axis=0).tolist(), co.max(axis=0).tolist()], "faces": len(loop_total), "vertices": len(vertices), "bytes": os.path.getsize(filepath), "saved_bytes": saved_bytes}
+
+# Stream polygons into per-tile accumulators in fixed-size chunks, writing each tile as soon as no later chunk can add to it
+# When the accumulators exceed the memory budget, the largest ones are spilled to temporary files and merged when written
+def stream_tiles(arrays, tile_indices, layout, base_name, origin, output_dir, memory_budget, file_format="PLY", weld_distance=None):
+	budget = max(int(memory_budget), 1) * 1048576
+	os.makedirs(output_dir, exist_ok=True)
+	spill_dir = None
+	
+	uv_values = get_active_uvs(arrays)
+	material_names = get_material_names(arrays)
+	
+	# Size chunks so one chunk of loop data uses a quarter of the budget
+	face_count = len(tile_indices)
+	loops_per_face = len(arrays["loop_vertex"]) / max(face_count, 1)
+	bytes_per_face = 13 + loops_per_face * (4 + (8 if uv_values is not None else 0) + (12 if arrays["normals"] is not None else 0))
+	chunk_faces = max(1024, int(budget * 0.25 / bytes_per_face))
+	
+	# The last polygon of each tile determines when the tile is finished
+	assigned = np.flatnonzero(tile_indices >= 0)
+	last_face = np.full(max(layout, default=-1) + 1, -1, dtype=np.int64)
+	np.maximum.at(last_face, tile_indices[assigned], assigned)
+	
+	accumulators = {}
+	stats = {"tiles": 0, "files": {}, "chunks": 0, "peak_buffer_bytes": 0, "spilled_bytes": 0, "peak_process_bytes": None}
+	held_bytes = 0
+	
+	for chunk_start in range(0, face_count, chunk_faces):
+		chunk_end = min(chunk_start + chunk_faces, face_count)
+		stats["chunks"] += 1
+		
+		# Append this chunk's polygons to the accumulator of each tile they belong to
+		for tile, faces in get_tile_faces(tile_indices[chunk_start:chunk_end]):
+			part = get_tile_part(arrays, faces + chunk_start, uv_values)
+			part_bytes = sum(values.nbytes for values in part.values())
+			accumulator = accumulators.setdefault(tile, {"parts": [], "spilled": [], "bytes": 0})
+			accumulator["parts"].append(part)
+			accumulator["bytes"] += part_bytes
+			held_bytes += part_bytes
+		stats["peak_buffer_bytes"] = max(stats["peak_buffer_bytes"], held_bytes)
+		
+		# Spill the largest accumulators to disk while over budget
+		while held_bytes > budget:
+			tile = max(accumulators, key=lambda key: accumulators[key]["bytes"])
+			accumulator = accumulators[tile]
+			if accumulator["bytes"] == 0:
+				break
+			# Each run spills into its own temporary folder, so leftovers of an interrupted run never collide with or block this one
+			if spill_dir is None:
+				spill_dir = tempfile.mkdtemp(prefix=".vf-segment-mesh-parts-", dir=output_dir)
+			spill_path = os.path.join(spill_dir, str(tile) + "-" + str(len(accumulator["spilled"])) + ".npz")
+			np.savez(spill_path, **{key: np.concatenate([part[key] for part in accumulator["parts"]]) for key in accumulator["parts"][0]})
+			accumulator["spilled"].append(spill_path)
+			accumulator["parts"] = []
+			stats["spilled_bytes"] += accumulator["bytes"]
+			held_bytes -= accumulator["bytes"]
+			accumulator["bytes"] = 0
+		
+		# Write and release every tile that is now complete
+		for tile in [tile for tile in accumulators if last_face[tile] < chunk_end]:
+			accumulator = accumulators.pop(tile)
+			# Spilled parts hold the earliest polygons, so they come first in the order they were spilled
+			spilled_parts = []
+			for spill_path in accumulator["spilled"]:
+				with np.load(spill_path) as spilled:
+					spilled_parts.append({key: spilled[key] for key in spilled.files})
+				os.remove(spill_path)
+			parts = spilled_parts + accumulator["parts"]
+			tile_name = get_tile_name(base_name, layout, tile)
+			filepath = os.path.join(output_dir, tile_name + "." + file_format.lower())
+			entry = write_tile_file(filepath, arrays, parts, origin, layout[tile]["center"], weld_distance, material_names)
+			if entry is not None:
+				stats["files"][tile_name] = dict(entry, path=filepath)
+				stats["tiles"] += 1
+			held_bytes -= accumulator["bytes"]
+	
+	if spill_dir is not None:
+		shutil.rmtree(spill_dir, ignore_errors=True)
+	stats["peak_process_bytes"] = get_peak_process_memory()
+	return stats
+
+
+
+# Mesh arrays shared with forked worker processes (inherited copy-on-write instead of being pickled for every tile)
+worker_arrays = None
+
+# Build and write a single tile file inside a worker process
+def write_tile_task(task):
+	filepath, faces, origin, tile_center, weld_distance, material_names = task
+	part = get_tile_part(worker_arrays, faces, get_active_uvs(worker_arrays))
+	return filepath, write_tile_file(filepath, worker_arrays, [part], origin, tile_center, weld_distance, material_names)
+
+# Number of worker processes to use (0 uses every CPU core)
+def get_worker_count(worker_count):
+	return worker_count if worker_count > 0 else (os.cpu_count() or 1)
+
+# Split the tile index into per-tile polygon lists and write the tiles across a pool of worker processes
+# Workers are forked so they share the source arrays with this process; where forking isn't available tiles are written serially
+def write_tiles_parallel(arrays, tile_indices, layout, base_name, origin, output_dir, workers, file_format="PLY", weld_distance=None):
+	global worker_arrays
+	os.makedirs(output_dir, exist_ok=True)
+	material_names = get_material_names(arrays)
+	tasks = []
+	for tile, faces in get_tile_faces(tile_indices):
+		tile_name = get_tile_name(base_name, layout, tile)
+		tasks.append((os.path.join(output_dir, tile_name + "." + file_format.lower()), faces, origin, layout[tile]["center"], weld_distance, material_names))
+	
+	stats = {"tiles": len(tasks), "files": {}, "workers": 1, "peak_process_bytes": None}
+	worker_arrays = arrays
+	try:
+		if workers > 1 and len(tasks) > 1 and "fork" in multiprocessing.get_all_start_methods():
+			stats["workers"] = min(workers, len(tasks))
+			with concurrent.futures.ProcessPoolExecutor(max_workers=stats["workers"], mp_context=multiprocessing.get_context("fork")) as executor:
+				results = list(executor.map(write_tile_task, tasks, chunksize=max(1, len(tasks) // (stats["workers"] * 4))))
+		else:
+			results = [write_tile_task(task) for task in tasks]
+	finally:
+		worker_arrays = None
+	
+	# Tiles that collapsed when welded have no entry
+	for filepath, entry in results:
+		if entry is not None:
+			stats["files"][os.path.splitext(os.path.basename(filepath))[0]] = dict(entry, path=filepath)
+	stats["tiles"] = len(stats["files"])
+	stats["peak_process_bytes"] = get_peak_process_memory()
+	return stats
+
+# Time the parallel tile writer from 1 to max_workers processes, writing into temporary folders
+def benchmark_worker_scaling(arrays, tile_indices, layout, base_name, origin, max_workers):
+	results = []
+	for workers in range(1, max_workers + 1):
+		with tempfile.TemporaryDirectory() as output_dir:
+			start_time = time.perf_counter()
+			stats = write_tiles_parallel(arrays, tile_indices, layout, base_name, origin, output_dir, workers)
+			seconds = time.perf_counter() - start_time
+		results.append({"workers": stats["workers"], "seconds": seconds, "speedup": (results[0]["seconds"] if results else seconds) / seconds})
+		print("VF Segment Mesh: " + str(stats["tiles"]) + " tiles with " + str(stats["workers"]) + " workers in " + "{:.3f}".format(seconds) + "s (" + "{:.2f}".format(results[-1]["speedup"]) + "x)")
+	return results
+
+
+
+# Fixed-size record of each tile in the binary tile index, so engine loaders can read (or memory map) it directly without parsing
+# Names and paths are byte strings sized to the longest of each in the index, so neither is ever truncated
+TILE_INDEX_DTYPE = [
+	("name", "S"),
+	("path", "S"),
+	("origin", "<f4", 3),
+	("bounds_min", "<f4", 3),
+	("bounds_max", "<f4", 3),
+	("faces", "<i8"),
+	("vertices", "<i8"),
+	("bytes", "<i8"),
+	]
+
+# Pack tile index entries into a structured array sorted by tile name (paths are relative to the index, names and paths UTF-8 encoded)
+def get_tile_index_records(tiles):
+	names = sorted(tiles)
+	text = {"name": [name.encode("utf-8") for name in names], "path": [(tiles[name]["file"] or "").encode("utf-8") for name in names]}
+	dtype = []
+	for field in TILE_INDEX_DTYPE:
+		if field[0] in text:
+			dtype.append((field[0], field[1] + str(max([len(value) for value in text[field[0]]] + [1]))))
+		else:
+			dtype.append(field)
+	records = np.zeros(len(names), dtype=dtype)
+	if names:
+		records["name"] = text["name"]
+		records["path"] = text["path"]
+		records["origin"] = [tiles[name]["origin"] for name in names]
+		records["bounds_min"] = [tiles[name]["bounds"][0] for name in names]
+		records["bounds_max"] = [tiles[name]["bounds"][1] for name in names]
+		for field in ("faces", "vertices", "bytes"):
+			records[field] = [tiles[name][field] for name in names]
+	return records
+
+# Write an index of the tiles with the file, origin, geometry bounds (in Blender world coordinates, Z up), and face, vertex, and byte counts of each tile
+# The index is saved as JSON and as a structured NumPy array (.npy) with the same contents, returning the JSON path
+def write_tile_index(output_dir, base_name, files, file_format):
+	filepath = os.path.join(output_dir, base_name + "-tiles.json")
+	tiles = {}
+	for name, entry in sorted(files.items()):
+		tiles[name] = {
+			"file": os.path.relpath(entry["path"], output_dir) if entry.get("path") else None,
+			"origin": entry["origin"],
+			"bounds": entry["bounds"],
+			# Entries kept from manifests of earlier versions have no counts
+			"faces": entry.get("faces", 0),
+			"vertices": entry.get("vertices", 0),
+			"bytes": entry.get("bytes", 0),
+			}
+	with open(filepath, "w") as file:
+		json.dump({"object": base_name, "format": file_format, "tiles": tiles}, file, indent=1)
+	np.save(os.path.splitext(filepath)[0] + ".npy", get_tile_index_records(tiles))
+	return filepath
+
+
+
+###########################################################################
+# Incremental tile output
+
+# Settings that don't change the contents of tile files (or only change which polygons they hold, which the hashes already cover), so changing them doesn't invalidate a manifest
+MANIFEST_IGNORED_SETTINGS = {"show_preview", "profile", "tile_output", "output_path", "memory_budget", "worker_count", "incremental", "island_cache", "island_cache_limit", "keep_source", "tile_index", "source_mode", "source_collection", "source_merge"}
+
+# Settings that tile files depend on, as JSON compatible values
+def get_manifest_settings(settings):
+	manifest_settings = {}
+	for name in vfSegmentMeshSettings.__annotations__:
+		if name not in MANIFEST_IGNORED_SETTINGS:
+			value = getattr(settings, name)
+			manifest_settings[name] = value if isinstance(value, (bool, int, float, str)) else list(value)
+	return manifest_settings
+
+# Finalise 64 bit hashes so similar inputs give unrelated results (splitmix64)
+def mix_hashes(values):
+	values = values ^ (values >> np.uint64(30))
+	values = values * np.uint64(0xbf58476d1ce4e5b9)
+	values = values ^ (values >> np.uint64(27))
+	values = values * np.uint64(0x94d049bb133111eb)
+	return values ^ (values >> np.uint64(31))
+
+# Hash every row of an array from its raw bytes
+def get_row_hashes(values):
+	if len(values) == 0:
+		return np.zeros(0, dtype=np.uint64)
+	rows = np.ascontiguousarray(values).reshape(len(values), -1).view(np.uint8)
+	multipliers = np.random.default_rng(rows.shape[1]).integers(1, 2**63, size=rows.shape[1], dtype=np.uint64) | np.uint64(1)
+	return mix_hashes((rows.astype(np.uint64) * multipliers).sum(axis=1, dtype=np.uint64))
+
+# Content hash of every polygon from the data written to tile files (corner positions in order and active UVs)
+# Hashes don't depend on polygon or vertex indices, so unrelated edits elsewhere in the mesh leave them unchanged
+def get_face_hashes(arrays):
+	loop_total = arrays["loop_total"]
+	loops, compact_start = get_face_loops(arrays["loop_start"], loop_total)
+	corner_hashes = get_row_hashes(arrays["co"])[arrays["loop_vertex"][loops]]
+	uv_values = get_active_uvs(arrays)
+	if uv_values is not None:
+		corner_hashes = mix_hashes(corner_hashes + get_row_hashes(uv_values)[loops])
+	corner_hashes = mix_hashes(corner_hashes + (np.arange(len(loops)) - np.repeat(compact_start, loop_total)).astype(np.uint64))
+	if len(compact_start) == 0:
+		return np.zeros(0, dtype=np.uint64)
+	return mix_hashes(np.add.reduceat(corner_hashes, compact_start) + loop_total.astype(np.uint64))
+
+# Content hash of every non-empty tile, combining the hashes of its polygons regardless of their order
+def get_tile_hashes(face_hashes, tile_indices):
+	assigned = np.flatnonzero(tile_indices >= 0)
+	tile_sums = np.zeros(int(tile_indices.max()) + 1 if len(assigned) else 0, dtype=np.uint64)
+	np.add.at(tile_sums, tile_indices[assigned], face_hashes[assigned])
+	tiles = np.unique(tile_indices[assigned])
+	return {int(tile): "{:016x}".format(int(value)) for tile, value in zip(tiles, mix_hashes(tile_sums[tiles]))}
+
+# Manifest file paths for a mesh in an output folder (tile entries as JSON, per-polygon hashes and tile assignments as NumPy arrays)
+def get_manifest_paths(output_dir, base_name):
+	return os.path.join(output_dir, base_name + "-manifest.json"), os.path.join(output_dir, base_name + "-manifest.npz")
+
+# Read the manifest saved by the last incremental run, or None if there isn't one
+def read_manifest(output_dir, base_name):
+	json_path, array_path = get_manifest_paths(output_dir, base_name)
+	if not os.path.isfile(json_path):
+		return None
+	with open(json_path) as file:
+		manifest = json.load(file)
+	manifest["face_hashes"] = None
+	if os.path.isfile(array_path):
+		with np.load(array_path) as faces:
+			manifest["face_hashes"] = faces["face_hashes"]
+	return manifest
+
+# Write only the tiles whose contents changed since the manifest in the output folder was saved, using the given tile writer
+# Files of tiles that are now empty are removed, and a manifest saved with different settings rebuilds every tile
+def write_tiles_incremental(arrays, tile_indices, layout, base_name, output_dir, manifest_settings, write_tiles):
+	os.makedirs(output_dir, exist_ok=True)
+	manifest = read_manifest(output_dir, base_name)
+	previous = manifest["tiles"] if manifest and manifest.get("settings") == manifest_settings else {}
+	
+	face_hashes = get_face_hashes(arrays)
+	tile_hashes = get_tile_hashes(face_hashes, tile_indices)
+	tile_names = {tile: get_tile_name(base_name, layout, tile) for tile in tile_hashes}
+	
+	# A tile is rebuilt when its hash changed or its file has gone missing
+	changed = np.zeros(max(layout, default=-1) + 1, dtype=bool)
+	for tile, name in tile_names.items():
+		entry = previous.get(name)
+		changed[tile] = entry is None or entry["hash"] != tile_hashes[tile] or not os.path.isfile(entry["path"])
+	stats = write_tiles(np.where((tile_indices >= 0) & changed[tile_indices], tile_indices, -1))
+	
+	removed = [name for name in previous if name not in tile_names.values()]
+	for name in removed:
+		if os.path.isfile(previous[name]["path"]):
+			os.remove(previous[name]["path"])
+	
+	# Unchanged tiles keep their previous file entries, and rebuilt tiles that collapsed when welded lose theirs
+	tiles = {}
+	for tile, name in tile_names.items():
+		if changed[tile] and name not in stats["files"]:
+			if name in previous and os.path.isfile(previous[name]["path"]):
+				os.remove(previous[name]["path"])
+			continue
+		tiles[name] = dict(stats["files"][name] if changed[tile] else previous[name], hash=tile_hashes[tile])
+	
+	json_path, array_path = get_manifest_paths(output_dir, base_name)
+	with open(json_path, "w") as file:
+		json.dump({"version": 1, "settings": manifest_settings, "faces": len(face_hashes), "tiles": tiles}, file, indent=1)
+	np.savez(array_path, face_hashes=face_hashes, face_tiles=tile_indices, tile_names=np.array([tile_names.get(tile, "") for tile in range(max(layout, default=-1) + 1)]))
+	
+	previous_hashes = manifest["face_hashes"] if manifest and manifest["face_hashes"] is not None and previous else np.zeros(0, dtype=np.uint64)
+	stats["changed_faces"] = int(np.count_nonzero(~np.isin(face_hashes, previous_hashes)))
+	stats["written"] = stats["files"]
+	stats["files"] = tiles
+	stats["skipped"] = len(tile_names) - int(np.count_nonzero(changed))
+	stats["removed"] = len(removed)
+	return stats
+
+
+
+# Name of the island node group, which is built on first use and reused by later runs in the same session
+# Once the modifier is applied or removed the group has no users, so it isn't saved with the .blend file
+ISLAND_NODE_GROUP_NAME = "VF-StoreIslandAttributes"
+
+# Get the island node group, only building it when it doesn't exist yet
+def get_island_node_group():
+	node_group = bpy.data.node_groups.get(ISLAND_NODE_GROUP_NAME)
+	if node_group is None or node_group.bl_idname != 'GeometryNodeTree':
+		node_group = store_island_attributes_node_group()
+	return node_group
 
 # Many thanks to Brendan Parmer for making this easy https://github.com/BrendanParmer/NodeToPython
-@persistent
 def store_island_attributes_node_group():
-	store_island_attributes= bpy.data.node_groups.new(type = 'GeometryNodeTree', name = "VF-StoreIslandAttributes-TEMP")
+	store_island_attributes= bpy.data.node_groups.new(type = 'GeometryNodeTree', name = ISLAND_NODE_GROUP_NAME)
 	
 	#initialize store_island_attributes nodes
 	#store_island_attributes outputs
@@ -421,63 +2678,220 @@ def store_island_attributes_node_group():
 
 
 
-@persistent
+# Evaluate the island node group on a temporary object that shares the mesh data, reading the island attributes without writing them into the mesh
+# The temporary object has no transform or other modifiers, so positions are transformed by the matrix when one is given
+def get_node_island_arrays(context, mesh_data, matrix=None):
+	temp_object = bpy.data.objects.new("VF-StoreIslandAttributes-TEMP", mesh_data)
+	context.scene.collection.objects.link(temp_object)
+	mod = temp_object.modifiers.new(name="VF-StoreIslandAttributes-TEMP", type='NODES')
+	mod.node_group = get_island_node_group()
+	depsgraph = context.evaluated_depsgraph_get()
+	depsgraph.update()
+	evaluated_object = temp_object.evaluated_get(depsgraph)
+	evaluated_mesh = evaluated_object.to_mesh()
+	islands = {
+		"island_index": foreach_get_array(evaluated_mesh.attributes["island_index"].data, "value", 1, np.int32),
+		"island_mean": foreach_get_array(evaluated_mesh.attributes["island_mean"].data, "vector", 3).astype(np.float64),
+		"island_weighted": foreach_get_array(evaluated_mesh.attributes["island_weighted"].data, "vector", 3).astype(np.float64),
+		}
+	evaluated_object.to_mesh_clear()
+	bpy.data.objects.remove(temp_object)
+	
+	if matrix is not None:
+		matrix = np.array(matrix, dtype=np.float64)
+		for name in ("island_mean", "island_weighted"):
+			islands[name] = islands[name] @ matrix[:3, :3].T + matrix[:3, 3]
+	return islands
+
+# Time both island engines on a temporary copy of a mesh object (run from the Python console to compare engines on production data)
+def benchmark_island_engines(context, mesh_object, repeats=3):
+	timings = {"NUMPY": [], "NODES": []}
+	
+	# NumPy engine, including the bulk array reads it depends on
+	for i in range(repeats):
+		start = time.perf_counter()
+		get_island_positions(read_mesh_arrays(mesh_object))
+		timings["NUMPY"].append(time.perf_counter() - start)
+	
+	# Geometry Nodes engine, evaluated on a temporary object so the source mesh is left untouched
+	for i in range(repeats):
+		start = time.perf_counter()
+		get_node_island_arrays(context, mesh_object.data)
+		timings["NODES"].append(time.perf_counter() - start)
+	
+	# Report the best time for each engine
+	for engine, values in timings.items():
+		print("VF Segment Mesh island engine " + engine + ": " + "{:.3f}".format(min(values)) + "s (best of " + str(repeats) + ")")
+	return timings
+
+
+
+###########################################################################
+# Tile occupancy preview
+
+# Name of the preview mesh created by earlier versions of the add-on
+PREVIEW_MESH_NAME = "VF-SegmentMeshPreview-TEMP"
+
+# Built-in shader with per-vertex colours (renamed in Blender 3.4)
+PREVIEW_SHADER = "SMOOTH_COLOR" if bpy.app.version >= (3, 4, 0) else "3D_SMOOTH_COLOR"
+
+# Seconds to wait after a settings change before rebuilding the preview, so changes made in quick succession are rebuilt once
+PREVIEW_DELAY = 0.1
+
+# Viewport draw handlers, cached per-polygon arrays of the previewed mesh, and the batches and labels currently drawn
+preview_state = {"handlers": None, "source": None, "positions": None, "weights": None, "keys": None, "batches": None, "labels": []}
+
+# World space positions, budget weights, and tile keys (when grouping by key) of every polygon of the active mesh
+# These are cached, so changing grid settings only repeats the tile assignment (the mesh is read again when it, the segment type, the unit, or the key changes)
+def get_preview_arrays(context, settings):
+	mesh_object = context.active_object
+	if mesh_object is None or mesh_object.type != 'MESH' or mesh_object.mode == 'EDIT':
+		return preview_state["positions"], preview_state["weights"], preview_state["keys"]
+	mesh_data = mesh_object.data
+	source = (mesh_object.name, mesh_data.name, len(mesh_data.vertices), len(mesh_data.polygons), settings.tile_segment, settings.tile_budget_unit, settings.tile_assign, settings.tile_key, tuple(tuple(row) for row in mesh_object.matrix_world))
+	if preview_state["source"] != source:
+		arrays = read_mesh_arrays(mesh_object)
+		if settings.tile_segment not in POLYGON_SEGMENTS and not load_cached_islands(arrays, settings.island_cache):
+			store_cached_islands(arrays, get_island_positions(arrays), settings.island_cache, settings.island_cache_limit)
+		matrix = np.array(mesh_object.matrix_world)
+		positions = get_polygon_positions(arrays, settings.tile_segment) @ matrix[:3, :3].T + matrix[:3, 3]
+		keys = get_face_keys(arrays, settings.tile_assign, settings.tile_key) if settings.tile_assign != "GRID" and has_tile_key(mesh_object, settings) else None
+		preview_state.update(source=source, positions=positions, weights=get_face_weights(arrays, settings.tile_budget_unit), keys=keys)
+	return preview_state["positions"], preview_state["weights"], preview_state["keys"]
+
+# Tile layout for the current settings, and the summed polygon weight of every tile (None without a mesh)
+def get_preview_tiles(settings, positions, weights, keys=None):
+	start, size, count = get_settings_grid(settings)
+	if keys is not None:
+		tile_indices, layout = get_key_tiles(positions, *keys)
+		if settings.tile_balance:
+			tile_indices, layout = balance_tiles(positions, tile_indices, weights, layout, settings.tile_budget)
+		assigned = tile_indices >= 0
+		return layout, np.bincount(tile_indices[assigned], weights=weights[assigned], minlength=max(layout, default=-1) + 1)
+	if settings.grid_fit == "AUTO" and positions is not None:
+		start, size, count, heaviest = fit_grid(positions, weights, settings.tile_budget)
+	layout = get_grid_layout(start, size, count)
+	if positions is None:
+		return layout, None
+	tile_indices = get_tile_indices(positions, start, size, count, settings.tile_bounds == "OUT")
+	if settings.tile_layout == "QUADTREE":
+		empty_tiles = np.setdiff1d(np.arange(len(layout)), tile_indices)
+		tile_indices, quadtree_layout, lod_tiles = get_quadtree_tiles(positions, tile_indices, weights, start, size, count, settings.tile_budget, settings.quadtree_depth)
+		# Empty grid tiles have no quadtree cells, but are still shown
+		layout = {**quadtree_layout, **{len(quadtree_layout) + index: layout[tile] for index, tile in enumerate(empty_tiles)}}
+	if settings.tile_balance:
+		tile_indices, layout = balance_tiles(positions, tile_indices, weights, layout, settings.tile_budget)
+	assigned = tile_indices >= 0
+	return layout, np.bincount(tile_indices[assigned], weights=weights[assigned], minlength=max(layout) + 1)
+
+# Build the outline and heatmap batches for a tile layout, plus labels for empty and overloaded tiles
+def get_preview_batches(layout, values, budget, unit):
+	tiles = sorted(layout)
+	bounds = np.array([layout[tile]["bounds"] for tile in tiles], dtype=np.float32).reshape(-1, 4)
+	corners = np.zeros((len(tiles), 4, 3), dtype=np.float32)
+	corners[:, :, 0] = bounds[:, [0, 2, 2, 0]]
+	corners[:, :, 1] = bounds[:, [1, 1, 3, 3]]
+	shader = gpu.shader.from_builtin(PREVIEW_SHADER)
+	
+	lines = corners[:, [0, 1, 1, 2, 2, 3, 3, 0]].reshape(-1, 3)
+	batches = [batch_for_shader(shader, 'LINES', {"pos": lines, "color": np.tile(np.array([1.0, 1.0, 1.0, 0.6], dtype=np.float32), (len(lines), 1))})]
+	if values is None:
+		return batches, []
+	
+	# Blue to red by the fraction of the budget used, with empty tiles left clear and overloaded tiles highlighted
+	values = values[tiles]
+	load = np.clip(values / max(budget, 1), 0.0, 1.0)[:, np.newaxis]
+	colors = np.hstack((load, 0.3 * (1.0 - load), 1.0 - load, np.full_like(load, 0.35))).astype(np.float32)
+	colors[values <= 0.0] = (0.5, 0.5, 0.5, 0.05)
+	colors[values > budget] = (1.0, 0.0, 1.0, 0.6)
+	triangles = corners[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 3)
+	batches.insert(0, batch_for_shader(shader, 'TRIS', {"pos": triangles, "color": np.repeat(colors, 6, axis=0)}))
+	
+	labels = []
+	for tile, value in zip(tiles, values):
+		if value <= 0.0:
+			labels.append((layout[tile]["center"], "Empty"))
+		elif value > budget:
+			labels.append((layout[tile]["center"], "Over " + (format_bytes(value) if unit == "BYTES" else str(int(value)) + " " + unit.lower())))
+	return batches, labels
+
+# Viewport draw callback for the tile outlines and heatmap
+def draw_preview_tiles():
+	if preview_state["batches"] is None:
+		return
+	shader = gpu.shader.from_builtin(PREVIEW_SHADER)
+	gpu.state.blend_set('ALPHA')
+	for batch in preview_state["batches"]:
+		batch.draw(shader)
+	gpu.state.blend_set('NONE')
+
+# Viewport draw callback for the labels of empty and overloaded tiles
+def draw_preview_labels():
+	region = bpy.context.region
+	region_3d = bpy.context.region_data
+	blf.size(0, 12)
+	blf.color(0, 1.0, 1.0, 1.0, 1.0)
+	for center, text in preview_state["labels"]:
+		point = location_3d_to_region_2d(region, region_3d, center)
+		if point is not None:
+			width, height = blf.dimensions(0, text)
+			blf.position(0, point.x - width * 0.5, point.y - height * 0.5, 0.0)
+			blf.draw(0, text)
+
+# Remove the viewport draw handlers and release the cached preview data
+def remove_preview_handlers():
+	if preview_state["handlers"]:
+		bpy.types.SpaceView3D.draw_handler_remove(preview_state["handlers"][0], 'WINDOW')
+		bpy.types.SpaceView3D.draw_handler_remove(preview_state["handlers"][1], 'WINDOW')
+	preview_state.update(handlers=None, source=None, positions=None, weights=None, keys=None, batches=None, labels=[])
+
+# Settings update callback, scheduling a preview rebuild shortly after the last change so dragging a slider doesn't rebuild the preview on every step
+# Every change restarts the timer, so the rebuild only runs once changes pause for the full delay
 def vf_segment_mesh_preview(self, context):
-	mesh_name = "VF-SegmentMeshPreview-TEMP"
+	if bpy.app.background:
+		update_preview(context)
+	else:
+		if bpy.app.timers.is_registered(update_preview_timer):
+			bpy.app.timers.unregister(update_preview_timer)
+		bpy.app.timers.register(update_preview_timer, first_interval=PREVIEW_DELAY)
 	
-	# Remove existing mesh data block (and associated object) if it exists
-	if mesh_name in bpy.data.meshes:
-		bpy.data.meshes.remove(bpy.data.meshes[mesh_name])
+	# Done
+	return None
+
+# Timer callback for the delayed preview rebuild, using the context of the first window (timers run without one)
+def update_preview_timer():
+	windows = bpy.context.window_manager.windows
+	if len(windows) > 0:
+		with bpy.context.temp_override(window=windows[0], screen=windows[0].screen):
+			update_preview(bpy.context)
 	
-	# Stop now if the preview mesh is disabled
-	if not context.scene.vf_segment_mesh_settings.show_preview:
-		# Done
-		return None
+	# Don't repeat the timer
+	return None
+
+# Draw the tile grid in the viewport coloured by how full each tile would be
+def update_preview(context):
+	# Remove the preview mesh of earlier add-on versions (and the associated object) if it exists
+	if PREVIEW_MESH_NAME in bpy.data.meshes:
+		bpy.data.meshes.remove(bpy.data.meshes[PREVIEW_MESH_NAME])
+	
+	settings = context.scene.vf_segment_mesh_settings
+	if not settings.show_preview:
+		remove_preview_handlers()
+	else:
+		if preview_state["handlers"] is None:
+			preview_state["handlers"] = (
+				bpy.types.SpaceView3D.draw_handler_add(draw_preview_tiles, (), 'WINDOW', 'POST_VIEW'),
+				bpy.types.SpaceView3D.draw_handler_add(draw_preview_labels, (), 'WINDOW', 'POST_PIXEL'),
+				)
+		positions, weights, keys = get_preview_arrays(context, settings)
+		layout, values = get_preview_tiles(settings, positions, weights, keys)
+		preview_state["batches"], preview_state["labels"] = get_preview_batches(layout, values, settings.tile_budget, settings.tile_budget_unit)
 	
-	# Set up local variables
-	sizeX = context.scene.vf_segment_mesh_settings.tile_size[0]
-	sizeY = context.scene.vf_segment_mesh_settings.tile_size[1]
-	countX = context.scene.vf_segment_mesh_settings.tile_count[0]
-	countY = context.scene.vf_segment_mesh_settings.tile_count[1]
-	
-	# Save the current object selection
-	active_object_name = str(context.active_object.name) if context.active_object else False
-	selected_objects = [obj for obj in context.selected_objects]
-	
-	# Create primitive grid
-	bpy.ops.mesh.primitive_grid_add(
-		x_subdivisions=countX,
-		y_subdivisions=countY,
-		size=1,
-		enter_editmode=False,
-		align='WORLD',
-		location=(0.0, 0.0, 0.0),
-		rotation=(0.0, 0.0, 0.0),
-		scale=(sizeX * countX, sizeY * countY, 1.0))
-	
-	# Set scale
-	context.active_object.scale = (sizeX * countX, sizeY * countY, 1.0)
-	bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-	
-	# Convert to wireframe and disable for rendering
-	bpy.ops.object.modifier_add(type='WIREFRAME')
-	context.object.modifiers["Wireframe"].thickness = float(max(sizeX, sizeY)) * 0.05
-#	bpy.ops.object.modifier_apply()
-	context.object.hide_render = True
-		
-	# Rename object and mesh data block
-	context.active_object.name = mesh_name
-	context.active_object.data.name = mesh_name
-	
-	# Reset selection
-	context.active_object.select_set(False)
-	if active_object_name:
-		context.view_layer.objects.active = bpy.data.objects[active_object_name]
-	# If one or more objects were originally selected, restore that selection set
-	if len(selected_objects) >= 1:
-		# Re-select previously selected objects
-		for obj in selected_objects:
-			obj.select_set(True)
+	# Redraw every 3D view
+	if context.screen:
+		for area in context.screen.areas:
+			if area.type == 'VIEW_3D':
+				area.tag_redraw()
 	
 	# Done
 	return None
@@ -488,6 +2902,36 @@ def vf_segment_mesh_preview(self, context):
 # Project settings and UI rendering classes
 
 class vfSegmentMeshSettings(bpy.types.PropertyGroup):
+	source_mode: bpy.props.EnumProperty(
+		name = 'Source',
+		description = 'Mesh objects segmented in one run against a shared tile grid',
+		items = [
+			('ACTIVE', 'Active Object', 'Segment the active mesh object'),
+			('SELECTED', 'Selected Objects', 'Segment every selected mesh object against the same grid (the source objects are kept)'),
+			('COLLECTION', 'Collection', 'Segment every mesh object in a collection and its child collections against the same grid (the source objects are kept)')
+			],
+		default = 'ACTIVE')
+	source_collection: bpy.props.PointerProperty(
+		name = 'Collection',
+		description = 'Collection of mesh objects to segment',
+		type = bpy.types.Collection)
+	source_merge: bpy.props.EnumProperty(
+		name = 'Combine',
+		description = 'Combine the geometry of every source in each tile, or create separate tiles for each source',
+		items = [
+			('MERGED', 'Merged', 'Create a single tile per grid tile containing the geometry of every source (object settings and modifiers come from the active or first object)'),
+			('GROUPED', 'Per Source', 'Create separate tiles for each source object, named after the source')
+			],
+		default = 'GROUPED')
+	grid_fit: bpy.props.EnumProperty(
+		name = 'Grid',
+		description = 'Set the tile grid manually, or fit it to the mesh',
+		items = [
+			('MANUAL', 'Manual', 'Use the tile size, count, and centre settings'),
+			('AUTO', 'Auto-Fit', 'Fit the tile size, count, and centre to the bounds of the mesh so every tile is within the budget (the fitted values are saved to the settings)')
+			],
+		default = 'MANUAL',
+		update = vf_segment_mesh_preview)
 	tile_size: bpy.props.FloatVectorProperty(
 		name='Size',
 		description='Size of each X/Y tile',
@@ -499,7 +2943,7 @@ class vfSegmentMeshSettings(bpy.types.PropertyGroup):
 		soft_min=1.0,
 		soft_max=1000.0,
 		min=0.0,
-		max=10000.0,
+		max=1000000.0,
 		update=vf_segment_mesh_preview)
 	tile_count: bpy.props.IntVectorProperty(
 		name="Count",
@@ -513,6 +2957,81 @@ class vfSegmentMeshSettings(bpy.types.PropertyGroup):
 		min=1,
 		max=64,
 		update=vf_segment_mesh_preview)
+	grid_center: bpy.props.FloatVectorProperty(
+		name='Centre',
+		description='World position of the centre of the tile grid',
+		subtype='XYZ_LENGTH',
+		size=2,
+		default=(0.0, 0.0),
+		step=1,
+		precision=2,
+		update=vf_segment_mesh_preview)
+	tile_layout: bpy.props.EnumProperty(
+		name = 'Layout',
+		description = 'Use a flat grid of tiles, or adaptively subdivide dense tiles',
+		items = [
+			('GRID', 'Grid', 'Divide the mesh into a single flat grid of tiles'),
+			('QUADTREE', 'Quadtree', 'Recursively split each grid tile into quarters until it falls within the tile budget, grouping tiles into collections by level')
+			],
+		default = 'GRID',
+		update = vf_segment_mesh_preview)
+	tile_assign: bpy.props.EnumProperty(
+		name = 'Assign',
+		description = 'Assign polygons to tiles by their grid position, or group them by a face attribute or vertex group',
+		items = [
+			('GRID', 'Grid Position', 'Assign polygons to the grid tile containing their element position'),
+			('ATTRIBUTE', 'Attribute', 'Create one tile for every distinct value of an attribute (such as island_index or a district ID), read from the first corner of each polygon for point and corner attributes'),
+			('VERTEX_GROUP', 'Vertex Group', 'Create one tile for every vertex group, assigning each polygon to the group with the most weight across its corners')
+			],
+		default = 'GRID',
+		update = vf_segment_mesh_preview)
+	tile_key: bpy.props.StringProperty(
+		name = "Attribute",
+		description = "Name of the attribute used to group polygons into tiles",
+		default = "island_index",
+		maxlen = 1024,
+		update = vf_segment_mesh_preview)
+	tile_balance: bpy.props.BoolProperty(
+		name = "Balance",
+		description = "Split tiles over the budget in two along their longest axis, and merge neighbouring tiles that fit within the budget together",
+		default = False,
+		update = vf_segment_mesh_preview)
+	tile_budget: bpy.props.IntProperty(
+		name = "Budget",
+		description = "Maximum faces, estimated vertices, or estimated bytes per tile, used to subdivide quadtree tiles, fit the grid, and scale the preview heatmap",
+		default = 50000,
+		soft_min = 1000,
+		soft_max = 1000000,
+		min = 1,
+		update = vf_segment_mesh_preview)
+	tile_budget_unit: bpy.props.EnumProperty(
+		name = 'Unit',
+		description = 'Measure the tile budget in faces, estimated vertices, or estimated bytes',
+		items = [
+			('FACES', 'Faces', 'Budget is the number of faces per tile'),
+			('VERTICES', 'Vertices', 'Budget is the estimated number of vertices per tile (one per face corner, as exported without shared vertices)'),
+			('BYTES', 'Bytes', 'Budget is the estimated size of each tile in bytes (index, position, normal, and UV data per face corner)')
+			],
+		default = 'FACES',
+		update = vf_segment_mesh_preview)
+	quadtree_depth: bpy.props.IntProperty(
+		name = "Depth",
+		description = "Maximum number of times a grid tile can be subdivided",
+		default = 4,
+		min = 1,
+		max = 12,
+		update = vf_segment_mesh_preview)
+	tile_lod: bpy.props.BoolProperty(
+		name = "Coarse LODs",
+		description = "Create an additional decimated tile for every subdivided quadtree cell, containing all of the geometry below it",
+		default = False)
+	lod_ratio: bpy.props.FloatProperty(
+		name = "Ratio",
+		description = "Decimation ratio of the coarse LOD tiles",
+		default = 0.25,
+		min = 0.0,
+		max = 1.0,
+		subtype = 'FACTOR')
 	tile_bounds: bpy.props.EnumProperty(
 		name = 'Include',
 		description = 'Specify if geometry outside the tile area will be included in the nearest tile or not',
@@ -520,16 +3039,42 @@ class vfSegmentMeshSettings(bpy.types.PropertyGroup):
 			('IN', 'Only Inside', 'Limits tile content to only the elements that fall within each tile boundary'),
 			('OUT', 'Extend Edges', 'Includes content beyond the edges of the tile array, ensuring nothing is left out')
 			],
-		default = 'OUT')
+		default = 'OUT',
+		update = vf_segment_mesh_preview)
 	tile_segment: bpy.props.EnumProperty(
 		name = 'Segment',
 		description = 'Segment mesh by individual polygons or connected mesh islands',
 		items = [
 			('POLY', 'Per Polygon', 'Segment mesh by individual polygons (cuts apart merged elements)'),
+			('CLIP', 'Clip to Tiles', 'Cut polygons exactly along the tile boundaries, interpolating UVs and attributes, so tile bounds are tight (cuts apart merged elements)'),
 			('AVERAGE', 'Island Average', 'Segment mesh based on the average vertex positions of each contiguous island (maintains merged elements)'),
 			('WEIGHTED', 'Island Weighted', 'Segment mesh based on the weighted polygon positions of each contiguous island (maintains merged elements)')
 			],
-		default = 'WEIGHTED')
+		default = 'WEIGHTED',
+		update = vf_segment_mesh_preview)
+	island_engine: bpy.props.EnumProperty(
+		name = 'Islands',
+		description = 'Method used to find connected mesh islands',
+		items = [
+			('NUMPY', 'NumPy', 'Find islands in memory using a vectorized union-find (does not modify the source mesh)'),
+			('NODES', 'Geometry Nodes', 'Store island attributes in the source mesh using a temporary Geometry Nodes modifier (Blender 3.x only)')
+			],
+		default = 'NUMPY')
+	island_cache: bpy.props.EnumProperty(
+		name = 'Cache',
+		description = 'Reuse island data from earlier runs on identical geometry',
+		items = [
+			('NONE', 'None', 'Detect islands on every run'),
+			('MEMORY', 'Memory', 'Keep island data of recent meshes in memory until Blender is closed'),
+			('DISK', 'Disk', 'Save island data of recent meshes to a folder next to the .blend file')
+			],
+		default = 'MEMORY')
+	island_cache_limit: bpy.props.IntProperty(
+		name = "Limit",
+		description = "Number of meshes kept in the island cache before the least recently used are evicted",
+		default = 4,
+		min = 1,
+		soft_max = 32)
 	tile_origin: bpy.props.EnumProperty(
 		name = 'Origin',
 		description = 'Choose the desired origin for each tile',
@@ -542,9 +3087,77 @@ class vfSegmentMeshSettings(bpy.types.PropertyGroup):
 			('VOLUME', 'Volume', 'Set each tile origin to the geometry volume')
 			],
 		default = 'TILE')
+	tile_output: bpy.props.EnumProperty(
+		name = 'Output',
+		description = 'Create tiles as scene objects or stream them directly to files',
+		items = [
+			('OBJECTS', 'Objects', 'Create a new object for each tile in the current scene'),
+			('STREAM', 'Stream to Files', 'Process polygons in chunks and write each finished tile to a PLY file, keeping memory use within the memory budget')
+			],
+		default = 'OBJECTS')
+	tile_weld: bpy.props.BoolProperty(
+		name = "Weld",
+		description = "Weld coincident vertices within each tile, remove polygons that collapse, and reorder polygons and vertices for vertex cache locality",
+		default = False)
+	weld_distance: bpy.props.FloatProperty(
+		name = "Distance",
+		description = "Distance within which vertices are welded together",
+		subtype = "DISTANCE",
+		default = 0.0001,
+		precision = 5,
+		step = 0.01,
+		soft_max = 0.1,
+		min = 0.0,
+		max = 100.0)
+	keep_source: bpy.props.BoolProperty(
+		name = "Keep Source",
+		description = "Leave the source object untouched (no applied transforms, stored island attributes, or removed polygons), reading world space positions in memory instead so undo only stores the new tiles",
+		default = False)
+	tile_index: bpy.props.BoolProperty(
+		name = "Tile Index",
+		description = "Write a JSON and binary (.npy) index of the tile objects with the origin, bounds, and face, vertex, and estimated byte counts of every tile to the output path (streamed tiles always include an index)",
+		default = False)
+	output_path: bpy.props.StringProperty(
+		name = "Path",
+		description = "Folder for streamed tile files and tile indexes",
+		default = "//tiles/",
+		maxlen = 4096,
+		subtype = "DIR_PATH")
+	output_format: bpy.props.EnumProperty(
+		name = 'Format',
+		description = 'File format of the streamed tiles',
+		items = [
+			('PLY', 'PLY', 'Binary PLY polygons with texture coordinates, in Blender coordinates (Z up)'),
+			('GLB', 'glTF Binary', 'Triangulated binary glTF meshes with texture coordinates, converted to Y up and placed at the tile origin, for game engines')
+			],
+		default = 'PLY')
+	memory_budget: bpy.props.IntProperty(
+		name = "Memory",
+		description = "Approximate memory budget in megabytes for tile buffers while streaming (larger buffers are spilled to temporary files)",
+		subtype = "NONE",
+		default = 1024,
+		soft_min = 64,
+		soft_max = 16384,
+		min = 1,
+		max = 1048576)
+	incremental: bpy.props.BoolProperty(
+		name = "Incremental",
+		description = "Only write tiles whose contents changed since the last run, using a manifest of polygon and tile hashes saved in the output folder",
+		default = False)
+	worker_count: bpy.props.IntProperty(
+		name = "Workers",
+		description = "Number of worker processes used to write tile files when running headless (0 uses every CPU core)",
+		default = 1,
+		soft_max = 64,
+		min = 0,
+		max = 1024)
+	profile: bpy.props.BoolProperty(
+		name="Profile",
+		description="Record per-phase and per-tile timings, face counts, and memory use, then print a summary and write a JSON report next to the .blend file",
+		default=False)
 	show_preview: bpy.props.BoolProperty(
 		name="Preview",
-		description="Enable preview grid mesh",
+		description="Show the tile grid in the viewport, coloured by how much of the tile budget the active mesh would use in each tile",
 		default=False,
 		update=vf_segment_mesh_preview)
 
@@ -569,14 +3182,19 @@ class VFTOOLS_PT_segment_mesh(bpy.types.Panel):
 			
 	def draw(self, context):
 		try:
-			# Check if mesh object is selected
-			if context.active_object and context.active_object.type == 'MESH' and len(context.active_object.data.polygons) > 0:
+			# Check if mesh objects are selected (or in the source collection)
+			source_count = len(get_source_objects(context, context.scene.vf_segment_mesh_settings))
+			if source_count > 0:
 				button_enable = True
 				button_title = "Create " + str(context.scene.vf_segment_mesh_settings.tile_count[0] * context.scene.vf_segment_mesh_settings.tile_count[1]) + " Segments"
+				if context.scene.vf_segment_mesh_settings.tile_assign != "GRID":
+					button_title = "Create Segments by " + ("Attribute" if context.scene.vf_segment_mesh_settings.tile_assign == "ATTRIBUTE" else "Vertex Group")
+				if context.scene.vf_segment_mesh_settings.source_mode != "ACTIVE":
+					button_title += " from " + str(source_count) + " Meshes"
 				button_icon = "MESH_GRID"
 			else:
 				button_enable = False
-				button_title = "Select Mesh"
+				button_title = "Select Mesh" if context.scene.vf_segment_mesh_settings.source_mode != "COLLECTION" else "Select Collection"
 				button_icon = "OUTLINER_DATA_MESH"
 			
 			# UI Layout
@@ -584,13 +3202,77 @@ class VFTOOLS_PT_segment_mesh(bpy.types.Panel):
 			layout.use_property_decorate = False # No animation
 			layout.use_property_split = True
 			
-			layout.prop(context.scene.vf_segment_mesh_settings, 'tile_size')
-			layout.prop(context.scene.vf_segment_mesh_settings, 'tile_count')
+			col = layout.column(align=True)
+			col.prop(context.scene.vf_segment_mesh_settings, 'source_mode')
+			if context.scene.vf_segment_mesh_settings.source_mode == "COLLECTION":
+				col.prop(context.scene.vf_segment_mesh_settings, 'source_collection')
+			if context.scene.vf_segment_mesh_settings.source_mode != "ACTIVE":
+				col.prop(context.scene.vf_segment_mesh_settings, 'source_merge')
+			col = layout.column(align=True)
+			col.prop(context.scene.vf_segment_mesh_settings, 'tile_assign')
+			if context.scene.vf_segment_mesh_settings.tile_assign == "ATTRIBUTE":
+				col.prop(context.scene.vf_segment_mesh_settings, 'tile_key')
+			# The grid is only used to assign tiles by position (and to cut polygons when clipping)
+			grid_active = context.scene.vf_segment_mesh_settings.tile_assign == "GRID"
+			row = layout.row()
+			row.active = grid_active
+			row.prop(context.scene.vf_segment_mesh_settings, 'grid_fit')
+			col = layout.column()
+			col.active = context.scene.vf_segment_mesh_settings.grid_fit == "MANUAL" or not grid_active
+			col.prop(context.scene.vf_segment_mesh_settings, 'tile_size')
+			col.prop(context.scene.vf_segment_mesh_settings, 'tile_count')
+			col.prop(context.scene.vf_segment_mesh_settings, 'grid_center')
+			col = layout.column(align=True)
+			row = col.row(align=True)
+			row.active = grid_active
+			row.prop(context.scene.vf_segment_mesh_settings, 'tile_layout')
+			col.prop(context.scene.vf_segment_mesh_settings, 'tile_balance')
+			# The budget also sets the fitted grid and the scale of the preview heatmap
+			if context.scene.vf_segment_mesh_settings.tile_layout == "QUADTREE" or context.scene.vf_segment_mesh_settings.grid_fit == "AUTO" or context.scene.vf_segment_mesh_settings.tile_balance or context.scene.vf_segment_mesh_settings.show_preview:
+				row = col.row(align=True)
+				row.prop(context.scene.vf_segment_mesh_settings, 'tile_budget')
+				row.prop(context.scene.vf_segment_mesh_settings, 'tile_budget_unit', text="")
+			if context.scene.vf_segment_mesh_settings.tile_layout == "QUADTREE" and grid_active:
+				col.prop(context.scene.vf_segment_mesh_settings, 'quadtree_depth')
+				row = col.row(align=True)
+				row.prop(context.scene.vf_segment_mesh_settings, 'tile_lod')
+				sub = row.row(align=True)
+				sub.active = context.scene.vf_segment_mesh_settings.tile_lod
+				sub.prop(context.scene.vf_segment_mesh_settings, 'lod_ratio')
 			col = layout.column(align=True)
 			col.prop(context.scene.vf_segment_mesh_settings, 'tile_bounds')
 			col.prop(context.scene.vf_segment_mesh_settings, 'tile_segment')
+			row = col.row(align=True)
+			row.active = context.scene.vf_segment_mesh_settings.tile_segment not in POLYGON_SEGMENTS
+			row.prop(context.scene.vf_segment_mesh_settings, 'island_engine')
+			row = col.row(align=True)
+			row.active = context.scene.vf_segment_mesh_settings.tile_segment not in POLYGON_SEGMENTS
+			row.prop(context.scene.vf_segment_mesh_settings, 'island_cache')
+			sub = row.row(align=True)
+			sub.active = context.scene.vf_segment_mesh_settings.island_cache != "NONE"
+			sub.prop(context.scene.vf_segment_mesh_settings, 'island_cache_limit')
 			col.prop(context.scene.vf_segment_mesh_settings, 'tile_origin')
+			row = col.row(align=True)
+			row.prop(context.scene.vf_segment_mesh_settings, 'tile_weld')
+			sub = row.row(align=True)
+			sub.active = context.scene.vf_segment_mesh_settings.tile_weld
+			sub.prop(context.scene.vf_segment_mesh_settings, 'weld_distance')
+			col = layout.column(align=True)
+			col.prop(context.scene.vf_segment_mesh_settings, 'tile_output')
+			row = col.row(align=True)
+			row.active = context.scene.vf_segment_mesh_settings.source_mode == "ACTIVE" and context.scene.vf_segment_mesh_settings.tile_output == "OBJECTS"
+			row.prop(context.scene.vf_segment_mesh_settings, 'keep_source')
+			if context.scene.vf_segment_mesh_settings.tile_output == "OBJECTS":
+				col.prop(context.scene.vf_segment_mesh_settings, 'tile_index')
+				if context.scene.vf_segment_mesh_settings.tile_index:
+					col.prop(context.scene.vf_segment_mesh_settings, 'output_path')
+			if context.scene.vf_segment_mesh_settings.tile_output == "STREAM":
+				col.prop(context.scene.vf_segment_mesh_settings, 'output_path')
+				col.prop(context.scene.vf_segment_mesh_settings, 'output_format')
+				col.prop(context.scene.vf_segment_mesh_settings, 'memory_budget')
+				col.prop(context.scene.vf_segment_mesh_settings, 'incremental')
 			layout.prop(context.scene.vf_segment_mesh_settings, 'show_preview')
+			layout.prop(context.scene.vf_segment_mesh_settings, 'profile')
 						
 			if button_enable:
 				layout.operator(VF_SegmentMesh.bl_idname, text = button_title, icon = button_icon)
@@ -614,10 +3296,354 @@ def register():
 	bpy.types.Scene.vf_segment_mesh_settings = bpy.props.PointerProperty(type = vfSegmentMeshSettings)
 	
 def unregister():
+	if bpy.app.timers.is_registered(update_preview_timer):
+		bpy.app.timers.unregister(update_preview_timer)
+	remove_preview_handlers()
 	for cls in reversed(classes):
 		bpy.utils.unregister_class(cls)
 	del bpy.types.Scene.vf_segment_mesh_settings
 	
+###########################################################################
+# Benchmark suite
+
+# Name prefix for the synthetic benchmark objects
+BENCHMARK_NAME = "VF-Benchmark"
+
+# Generate a synthetic city mesh as flat arrays: each island is an extruded polygonal building with walls, a roof and a floor
+# The number of building sides is chosen so the total face count is close to face_count
+def generate_city_arrays(face_count, island_count, extent=1000.0, seed=0):
+	rng = np.random.default_rng(seed)
+	island_count = max(1, int(island_count))
+	sides = max(3, int(round(face_count / island_count)) - 2)
+	
+	# Building footprints scattered across the extent, scaled so buildings rarely overlap
+	centers = rng.uniform(-0.5 * extent, 0.5 * extent, (island_count, 2))
+	radius = rng.uniform(0.1, 0.35, island_count) * extent / np.sqrt(island_count)
+	height = rng.uniform(5.0, 60.0, island_count)
+	angles = np.arange(sides) * (2.0 * np.pi / sides)
+	ring = np.stack((np.cos(angles), np.sin(angles)), axis=1)
+	footprint = centers[:, np.newaxis, :] + radius[:, np.newaxis, np.newaxis] * ring[np.newaxis]
+	
+	# Bottom ring followed by top ring for every building
+	co = np.zeros((island_count, 2 * sides, 3), dtype=np.float32)
+	co[:, :sides, :2] = footprint
+	co[:, sides:, :2] = footprint
+	co[:, sides:, 2] = height[:, np.newaxis]
+	
+	# Wall quads, then the roof and floor polygons (floor reversed so it faces down)
+	k = np.arange(sides)
+	walls = np.stack((k, (k + 1) % sides, sides + (k + 1) % sides, sides + k), axis=1).ravel()
+	building_loops = np.concatenate((walls, sides + k, k[::-1]))
+	loop_vertex = (building_loops[np.newaxis, :] + (np.arange(island_count) * 2 * sides)[:, np.newaxis]).ravel()
+	loop_total = np.tile(np.concatenate((np.full(sides, 4), [sides, sides])), island_count)
+	
+	return {
+		"co": co.reshape(-1, 3),
+		"loop_vertex": loop_vertex.astype(np.int32),
+		"loop_start": (np.cumsum(loop_total) - loop_total).astype(np.int32),
+		"loop_total": loop_total.astype(np.int32),
+		}
+
+# Create a mesh object in the scene from flat mesh arrays
+def create_mesh_object(context, name, arrays):
+	mesh_data = bpy.data.meshes.new(name)
+	set_mesh_geometry(mesh_data, arrays["co"], arrays["loop_vertex"], arrays["loop_start"], arrays["loop_total"])
+	mesh_object = bpy.data.objects.new(name, mesh_data)
+	context.scene.collection.objects.link(mesh_object)
+	return mesh_object
+
+# Remove every benchmark object and its mesh data
+def remove_benchmark_objects():
+	for obj in [obj for obj in bpy.data.objects if obj.name.startswith(BENCHMARK_NAME)]:
+		mesh_data = obj.data
+		bpy.data.objects.remove(obj)
+		if mesh_data and mesh_data.users == 0:
+			bpy.data.meshes.remove(mesh_data)
+
+# Current resident memory of the process in bytes (Linux only, None elsewhere)
+def get_process_memory():
+	try:
+		with open("/proc/self/statm") as file:
+			return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+	except (OSError, ValueError, AttributeError):
+		return None
+
+# Identifiers of an enum setting, so the benchmark always covers every option in the panel
+def get_setting_items(name):
+	return [item[0] for item in vfSegmentMeshSettings.__annotations__[name].keywords["items"]]
+
+# Run every segment x origin x grid combination on synthetic meshes of each face and island count
+def run_benchmark(context, face_counts, island_counts, grid_counts, extent=1000.0, seed=0):
+	settings = context.scene.vf_segment_mesh_settings
+	settings.show_preview = False
+	settings.tile_output = "OBJECTS"
+	settings.source_mode = "ACTIVE"
+	# Every run measures island detection, so cached islands would skew the results
+	settings.island_cache = "NONE"
+	settings.grid_fit = "MANUAL"
+	settings.grid_center = (0.0, 0.0)
+	results = {
+		"blender": bpy.app.version_string,
+		"platform": sys.platform,
+		"python": sys.version.split()[0],
+		"created": time.strftime("%Y-%m-%d %H:%M:%S"),
+		"runs": [],
+		}
+	
+	for face_count in face_counts:
+		for island_count in island_counts:
+			arrays = generate_city_arrays(face_count, island_count, extent, seed)
+			for grid in grid_counts:
+				for segment in get_setting_items("tile_segment"):
+					for origin in get_setting_items("tile_origin"):
+						settings.tile_size = (extent / grid, extent / grid)
+						settings.tile_count = (grid, grid)
+						settings.tile_segment = segment
+						settings.tile_origin = origin
+						
+						# Fresh source object for every run, since segmenting consumes it
+						mesh_object = create_mesh_object(context, BENCHMARK_NAME, arrays)
+						for obj in context.selected_objects:
+							obj.select_set(False)
+						context.view_layer.objects.active = mesh_object
+						mesh_object.select_set(True)
+						
+						memory_before = get_process_memory()
+						start_time = time.perf_counter()
+						bpy.ops.object.vf_segment_mesh('EXEC_DEFAULT')
+						seconds = time.perf_counter() - start_time
+						memory_after = get_process_memory()
+						
+						run = {
+							"faces": len(arrays["loop_total"]),
+							"islands": island_count,
+							"grid": grid,
+							"segment": segment,
+							"origin": origin,
+							"seconds": seconds,
+							"phases": dict(last_run_stats["phases"]),
+							"tiles": last_run_stats["tiles"],
+							"memory_delta": memory_after - memory_before if memory_before is not None and memory_after is not None else None,
+							"peak_rss": get_peak_process_memory(),
+							}
+						results["runs"].append(run)
+						print("VF Segment Mesh benchmark: " + str(run["faces"]) + " faces, " + str(island_count) + " islands, " + str(grid) + "x" + str(grid) + ", " + segment + ", " + origin + ": " + "{:.3f}".format(seconds) + "s")
+						remove_benchmark_objects()
+	
+	return results
+
+# Compare two benchmark reports, print every matching run, and return the runs (or phases) that slowed down by more than the threshold
+def compare_benchmarks(baseline, current, threshold=0.1):
+	def get_key(run):
+		return (run["faces"], run["islands"], run["grid"], run["segment"], run["origin"])
+	baseline_runs = {get_key(run): run for run in baseline["runs"]}
+	regressions = []
+	
+	for run in current["runs"]:
+		old = baseline_runs.get(get_key(run))
+		if old is None:
+			continue
+		ratio = run["seconds"] / max(old["seconds"], 1e-9)
+		flag = "REGRESSION" if ratio > 1.0 + threshold else ("faster" if ratio < 1.0 - threshold else "")
+		print(" ".join(str(value) for value in get_key(run)) + ": " + "{:.3f}".format(old["seconds"]) + "s -> " + "{:.3f}".format(run["seconds"]) + "s (" + "{:+.1%}".format(ratio - 1.0) + ") " + flag)
+		if flag == "REGRESSION":
+			regressions.append({"run": get_key(run), "phase": None, "ratio": ratio})
+		
+		# Individual phases (ignoring phases too short to time reliably)
+		for phase, seconds in run["phases"].items():
+			old_seconds = old["phases"].get(phase)
+			if old_seconds and max(old_seconds, seconds) > 0.01 and seconds / old_seconds > 1.0 + threshold:
+				print("\t" + phase + ": " + "{:.3f}".format(old_seconds) + "s -> " + "{:.3f}".format(seconds) + "s REGRESSION")
+				regressions.append({"run": get_key(run), "phase": phase, "ratio": seconds / old_seconds})
+	
+	print("VF Segment Mesh: " + str(len(regressions)) + " regressions over " + "{:.0%}".format(threshold))
+	return regressions
+
+
+
+###########################################################################
+# Headless command line batch processing
+# blender -b --python VF_segmentMesh.py -- --input "osm/*.blend" --tile-size 250 250 --count 16 16 --segment WEIGHTED
+
+# Settings that are either UI-only or controlled by the dedicated command line options
+CLI_EXCLUDED_SETTINGS = {"show_preview", "tile_output", "output_path", "output_format", "source_collection"}
+
+# Build command line options from the settings properties, so the headless entry point always matches the panel
+def get_cli_parser():
+	parser = argparse.ArgumentParser(
+		prog="blender -b --python VF_segmentMesh.py --",
+		description="Segment every mesh in one or more files into grid tiles without the Blender interface. Options that are not given fall back to the settings saved in each .blend file, or the add-on defaults.")
+	parser.add_argument("--input", nargs="+", help="Input files or glob patterns (.blend, .obj, .ply, .glb, .gltf)")
+	parser.add_argument("--output", help="Output folder (defaults to a '<input name>-tiles' folder next to each input file)")
+	parser.add_argument("--format", choices=["PLY", "GLB", "BLEND"], default="PLY", help="Stream each tile to a PLY or binary glTF file, or save all tile objects to a single .blend file per input")
+	parser.add_argument("--benchmark-workers", type=int, metavar="N", help="Instead of writing tiles, time the parallel tile writer with 1 to N worker processes for each mesh")
+	
+	# Benchmark suite
+	parser.add_argument("--benchmark", action="store_true", help="Run the benchmark suite on synthetic city meshes instead of processing input files")
+	parser.add_argument("--benchmark-faces", type=int, nargs="+", default=[100000], metavar="FACES", help="Face counts of the synthetic meshes")
+	parser.add_argument("--benchmark-islands", type=int, nargs="+", default=[1000], metavar="ISLANDS", help="Island (building) counts of the synthetic meshes")
+	parser.add_argument("--benchmark-grids", type=int, nargs="+", default=[4, 16, 64], metavar="COUNT", help="Square tile counts to test")
+	parser.add_argument("--benchmark-report", default="vf-segment-mesh-benchmark.json", metavar="PATH", help="JSON file the benchmark results are written to")
+	parser.add_argument("--benchmark-compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="Compare two benchmark reports and flag regressions instead of running anything")
+	parser.add_argument("--benchmark-threshold", type=float, default=0.1, metavar="RATIO", help="Slowdown ratio flagged as a regression when comparing (0.1 flags anything 10%% slower)")
+	
+	for name, prop in vfSegmentMeshSettings.__annotations__.items():
+		if name in CLI_EXCLUDED_SETTINGS:
+			continue
+		keywords = prop.keywords
+		options = ["--" + name.replace("_", "-")]
+		if name.startswith("tile_"):
+			options.append("--" + name[len("tile_"):].replace("_", "-"))
+		arguments = {"dest": name, "default": None, "help": keywords.get("description")}
+		if prop.function in (bpy.props.FloatVectorProperty, bpy.props.IntVectorProperty):
+			arguments["type"] = float if prop.function == bpy.props.FloatVectorProperty else int
+			arguments["nargs"] = keywords.get("size", 3)
+		elif prop.function == bpy.props.EnumProperty:
+			arguments["choices"] = [item[0] for item in keywords["items"]]
+		elif prop.function == bpy.props.FloatProperty:
+			arguments["type"] = float
+		elif prop.function == bpy.props.IntProperty:
+			arguments["type"] = int
+		elif prop.function == bpy.props.BoolProperty:
+			arguments["action"] = argparse.BooleanOptionalAction
+		parser.add_argument(*options, **arguments)
+	
+	return parser
+
+# Expand file names and glob patterns into a sorted list of existing files
+def get_cli_inputs(patterns):
+	inputs = []
+	for pattern in patterns:
+		matches = sorted(glob.glob(os.path.expanduser(pattern)))
+		inputs.extend(matches if matches else [pattern])
+	return [os.path.abspath(filepath) for filepath in inputs]
+
+# Load a source file, either by opening it as the current .blend or importing it into an emptied scene
+def load_cli_input(filepath):
+	extension = os.path.splitext(filepath)[1].lower()
+	if extension == ".blend":
+		bpy.ops.wm.open_mainfile(filepath=filepath)
+		return
+	
+	# Clear the current file without resetting the registered add-on
+	for obj in list(bpy.data.objects):
+		bpy.data.objects.remove(obj)
+	bpy.data.orphans_purge(do_recursive=True)
+	
+	if extension == ".obj":
+		if bpy.app.version >= (3, 3, 0):
+			bpy.ops.wm.obj_import(filepath=filepath)
+		else:
+			bpy.ops.import_scene.obj(filepath=filepath)
+	elif extension == ".ply":
+		if bpy.app.version >= (4, 0, 0):
+			bpy.ops.wm.ply_import(filepath=filepath)
+		else:
+			bpy.ops.import_mesh.ply(filepath=filepath)
+	elif extension in (".glb", ".gltf"):
+		bpy.ops.import_scene.gltf(filepath=filepath)
+	else:
+		raise ValueError("Unsupported input format " + extension)
+
+# Segment every mesh object in a single input file and write the tiles out
+def segment_cli_input(filepath, args):
+	load_cli_input(filepath)
+	context = bpy.context
+	settings = context.scene.vf_segment_mesh_settings
+	
+	# Remove any saved preview grid first, so it's neither segmented nor rebuilt by the setting updates below
+	settings.show_preview = False
+	
+	# Apply command line overrides to the scene settings
+	for name in vfSegmentMeshSettings.__annotations__:
+		value = getattr(args, name, None)
+		if name not in CLI_EXCLUDED_SETTINGS and value is not None:
+			setattr(settings, name, value)
+	
+	stem = os.path.splitext(os.path.basename(filepath))[0]
+	output_dir = os.path.abspath(args.output) if args.output else os.path.join(os.path.dirname(filepath), stem + "-tiles")
+	os.makedirs(output_dir, exist_ok=True)
+	settings.tile_output = "OBJECTS" if args.format == "BLEND" else "STREAM"
+	if args.format != "BLEND":
+		settings.output_format = args.format
+	settings.output_path = output_dir
+	
+	# Collect object names first, since segmenting adds and removes objects
+	object_names = [obj.name for obj in context.view_layer.objects if obj.type == 'MESH' and len(obj.data.polygons) > 0]
+	
+	# Segment every mesh in the file against one shared grid in a single run
+	if settings.source_mode != "ACTIVE" and not args.benchmark_workers:
+		if settings.source_mode == "SELECTED":
+			for obj in context.view_layer.objects:
+				obj.select_set(obj.name in object_names)
+			if object_names:
+				context.view_layer.objects.active = bpy.data.objects[object_names[0]]
+		object_names = [None]
+	
+	# Worker scaling benchmark (positions are transformed to world space in memory, leaving the file untouched)
+	if args.benchmark_workers:
+		start, size, count = get_settings_grid(settings)
+		for object_name in object_names:
+			mesh_object = bpy.data.objects[object_name]
+			mesh_arrays = read_mesh_arrays(mesh_object, world_space=True)
+			tile_indices = get_tile_indices(get_polygon_positions(mesh_arrays, settings.tile_segment, "NUMPY"), start, size, count, settings.tile_bounds == "OUT")
+			print("VF Segment Mesh: worker scaling for " + object_name + " (" + str(len(tile_indices)) + " polygons)")
+			benchmark_worker_scaling(mesh_arrays, tile_indices, get_grid_layout(start, size, count), bpy.path.clean_name(object_name), settings.tile_origin, args.benchmark_workers)
+		return
+	for object_name in object_names:
+		if object_name is not None:
+			mesh_object = bpy.data.objects.get(object_name)
+			if mesh_object is None:
+				continue
+			for obj in context.selected_objects:
+				obj.select_set(False)
+			context.view_layer.objects.active = mesh_object
+			mesh_object.select_set(True)
+		
+		# Run the operator directly, skipping the confirmation dialog
+		start = time.perf_counter()
+		result = bpy.ops.object.vf_segment_mesh('EXEC_DEFAULT')
+		print("VF Segment Mesh: " + (object_name or settings.source_mode.lower() + " meshes") + " " + str(result) + " in " + "{:.2f}".format(time.perf_counter() - start) + "s")
+	
+	if args.format == "BLEND":
+		bpy.ops.wm.save_as_mainfile(filepath=os.path.join(output_dir, stem + "-tiles.blend"), copy=True)
+
+# Command line entry point, returns the process exit code
+def main(argv):
+	parser = get_cli_parser()
+	args = parser.parse_args(argv)
+	
+	# Benchmark modes
+	if args.benchmark_compare:
+		with open(args.benchmark_compare[0]) as file:
+			baseline = json.load(file)
+		with open(args.benchmark_compare[1]) as file:
+			current = json.load(file)
+		return 1 if compare_benchmarks(baseline, current, args.benchmark_threshold) else 0
+	if args.benchmark:
+		results = run_benchmark(bpy.context, args.benchmark_faces, args.benchmark_islands, args.benchmark_grids)
+		with open(args.benchmark_report, "w") as file:
+			json.dump(results, file, indent=1)
+		print("VF Segment Mesh: benchmark results written to " + os.path.abspath(args.benchmark_report))
+		return 0
+	
+	if not args.input:
+		parser.error("--input is required unless running a benchmark")
+	inputs = get_cli_inputs(args.input)
+	failures = 0
+	for filepath in inputs:
+		print("VF Segment Mesh: processing " + filepath)
+		try:
+			segment_cli_input(filepath, args)
+		except Exception as exc:
+			print(str(exc) + " | Error in VF Segment Mesh: " + filepath)
+			failures += 1
+	print("VF Segment Mesh: processed " + str(len(inputs) - failures) + " of " + str(len(inputs)) + " files")
+	return 1 if failures else 0
+
 if __name__ == "__main__":
 	register()
+	# Arguments after "--" run the headless batch process when Blender is started in background mode
+	if bpy.app.background and "--" in sys.argv:
+		sys.exit(main(sys.argv[sys.argv.index("--") + 1:]))
 	
\ No newline at end of file